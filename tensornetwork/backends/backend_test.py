@@ -379,4 +379,16 @@ def test_base_backend_log_not_implemented():
 def test_base_backend_expm_not_implemented():
   backend = BaseBackend()
   with pytest.raises(NotImplementedError):
-    backend.expm(np.ones((2, 2)))
\ No newline at end of file
+    backend.expm(np.ones((2, 2)))
+
+
+def test_base_backend_scale_rows_not_implemented():
+  backend = BaseBackend()
+  with pytest.raises(NotImplementedError):
+    backend.scale_rows(np.ones((2, 2)), np.ones(2))
+
+
+def test_base_backend_scale_cols_not_implemented():
+  backend = BaseBackend()
+  with pytest.raises(NotImplementedError):
+    backend.scale_cols(np.ones((2, 2)), np.ones(2))
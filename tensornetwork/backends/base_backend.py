@@ -522,6 +522,33 @@ class BaseBackend:
         "Backend '{}' has not implemented `broadcast_left_multiplication`."
         .format(self.name))
 
+  def scale_rows(self, matrix: Tensor, diag_vec: Tensor) -> Tensor:
+    """
+    Multiply `diag(diag_vec)` onto `matrix` from the left, i.e. scale the
+    rows of `matrix` by the elements of `diag_vec`, without building the
+    diagonal matrix. Same as `broadcast_left_multiplication(diag_vec, matrix)`.
+    Args:
+      matrix: A matrix.
+      diag_vec: A one-dimensional tensor.
+    Returns:
+      Tensor: The result of `diag(diag_vec) @ matrix`.
+    """
+    return self.broadcast_left_multiplication(diag_vec, matrix)
+
+  def scale_cols(self, matrix: Tensor, diag_vec: Tensor) -> Tensor:
+    """
+    Multiply `diag(diag_vec)` onto `matrix` from the right, i.e. scale the
+    columns of `matrix` by the elements of `diag_vec`, without building the
+    diagonal matrix. Same as
+    `broadcast_right_multiplication(matrix, diag_vec)`.
+    Args:
+      matrix: A matrix.
+      diag_vec: A one-dimensional tensor.
+    Returns:
+      Tensor: The result of `matrix @ diag(diag_vec)`.
+    """
+    return self.broadcast_right_multiplication(matrix, diag_vec)
+
   def sin(self, tensor: Tensor):
     """
     Return sin of `tensor`.
@@ -546,6 +573,16 @@ class BaseBackend:
         "Backend '{}' has not implemented `cos`."
         .format(self.name))
 
+  def sincos(self, tensor: Tensor) -> Tuple[Tensor, Tensor]:
+    """
+    Return sin and cos of `tensor`.
+    Args:
+      tensor: A tensor.
+    Returns:
+      (Tensor, Tensor): sin and cos of `tensor`.
+    """
+    return self.sin(tensor), self.cos(tensor)
+
   def exp(self, tensor: Tensor):
     """
     Return elementwise exp of `tensor`.
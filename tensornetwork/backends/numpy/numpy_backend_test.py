@@ -693,6 +693,15 @@ def test_elementwise_ops(dtype, method):
   np.testing.assert_almost_equal(tensor1, tensor2)
 
 
+@pytest.mark.parametrize("dtype", [np.float64, np.complex128])
+def test_sincos(dtype):
+  backend = numpy_backend.NumPyBackend()
+  tensor = backend.randn((4, 3, 2), dtype=dtype, seed=10)
+  sin, cos = backend.sincos(tensor)
+  np.testing.assert_almost_equal(sin, np.sin(tensor))
+  np.testing.assert_almost_equal(cos, np.cos(tensor))
+
+
 @pytest.mark.parametrize("dtype,method", [(np.float64, "expm"),
                                           (np.complex128, "expm")])
 def test_matrix_ops(dtype, method):
@@ -216,3 +216,148 @@ def rq_decomposition(
   r = tf.reshape(r, tf.concat([left_dims, [center_dim]], axis=-1))
   q = tf.reshape(q, tf.concat([[center_dim], right_dims], axis=-1))
   return r, q
+
+
+def svd_decomposition_batched(tf: Any,
+                              tensor: Tensor,
+                              split_axis: int,
+                              max_singular_values: Optional[int] = None
+                             ) -> Tuple[Tensor, Tensor, Tensor, Tensor]:
+  """Computes the singular value decompositions of a batch of tensors.
+
+  `tensor` is a stack of equally shaped tensors along its first axis. Each of
+  them is decomposed as in `svd_decomposition`, with `split_axis` referring to
+  the axes of the individual tensors (i.e. not counting the batch axis). All
+  decompositions are computed by a single batched `tf.linalg.svd` call instead
+  of one kernel launch per tensor.
+
+  For example, if `tensor` had a shape (7, 2, 3, 4, 5) and `split_axis` was 2,
+  then `u` would have shape (7, 2, 3, 6), `s` would have shape (7, 6), and `vh`
+  would have shape (7, 6, 4, 5).
+
+  Since all decompositions in the batch have to keep the same number of
+  singular values, only truncation to `max_singular_values` is supported.
+
+  Args:
+    tf: The tensorflow module.
+    tensor: A stack of tensors to be decomposed.
+    split_axis: Where to split the axes of each tensor before flattening into a
+      matrix.
+    max_singular_values: The number of singular values to keep, or `None` to
+      keep them all.
+
+  Returns:
+    u: Batch of left tensor factors.
+    s: Batch of vectors of ordered singular values from largest to smallest.
+    vh: Batch of right tensor factors.
+    s_rest: Batch of vectors of discarded singular values (length zero if no
+            truncation).
+  """
+  batch_dims = tf.shape(tensor)[:1]
+  left_dims = tf.shape(tensor)[1:split_axis + 1]
+  right_dims = tf.shape(tensor)[split_axis + 1:]
+
+  matrix_dims = tf.stack(
+      [tf.reduce_prod(left_dims), tf.reduce_prod(right_dims)])
+  tensor = tf.reshape(tensor, tf.concat([batch_dims, matrix_dims], axis=-1))
+  s, u, v = tf.linalg.svd(tensor)
+
+  if max_singular_values is None:
+    max_singular_values = tf.shape(s)[1]
+
+  # See `svd_decomposition` for why `s` is cast back to the input dtype.
+  s = tf.cast(s, tensor.dtype)
+
+  s_rest = s[:, max_singular_values:]
+  s = s[:, :max_singular_values]
+  u = u[:, :, :max_singular_values]
+  v = v[:, :, :max_singular_values]
+
+  vh = tf.linalg.adjoint(v)
+
+  dim_s = tf.shape(s)[1:]
+  u = tf.reshape(u, tf.concat([batch_dims, left_dims, dim_s], axis=-1))
+  vh = tf.reshape(vh, tf.concat([batch_dims, dim_s, right_dims], axis=-1))
+
+  return u, s, vh, s_rest
+
+
+def qr_decomposition_batched(
+    tf: Any,
+    tensor: Tensor,
+    split_axis: int,
+) -> Tuple[Tensor, Tensor]:
+  """Computes the QR decompositions of a batch of tensors.
+
+  `tensor` is a stack of equally shaped tensors along its first axis. Each of
+  them is decomposed as in `qr_decomposition`, with `split_axis` referring to
+  the axes of the individual tensors, using a single batched `tf.linalg.qr`
+  call.
+
+  For example, if `tensor` had a shape (7, 2, 3, 4, 5) and `split_axis` was 2,
+  then `q` would have shape (7, 2, 3, 6), and `r` would have shape
+  (7, 6, 4, 5).
+
+  Args:
+    tf: The tensorflow module.
+    tensor: A stack of tensors to be decomposed.
+    split_axis: Where to split the axes of each tensor before flattening into a
+      matrix.
+
+  Returns:
+    Q: Batch of left tensor factors.
+    R: Batch of right tensor factors.
+  """
+  batch_dims = tf.shape(tensor)[:1]
+  left_dims = tf.shape(tensor)[1:split_axis + 1]
+  right_dims = tf.shape(tensor)[split_axis + 1:]
+
+  matrix_dims = tf.stack(
+      [tf.reduce_prod(left_dims), tf.reduce_prod(right_dims)])
+  tensor = tf.reshape(tensor, tf.concat([batch_dims, matrix_dims], axis=-1))
+  q, r = tf.linalg.qr(tensor)
+  center_dims = tf.shape(q)[2:]
+  q = tf.reshape(q, tf.concat([batch_dims, left_dims, center_dims], axis=-1))
+  r = tf.reshape(r, tf.concat([batch_dims, center_dims, right_dims], axis=-1))
+  return q, r
+
+
+def rq_decomposition_batched(
+    tf: Any,
+    tensor: Tensor,
+    split_axis: int,
+) -> Tuple[Tensor, Tensor]:
+  """Computes the RQ decompositions of a batch of tensors.
+
+  `tensor` is a stack of equally shaped tensors along its first axis. Each of
+  them is decomposed as in `rq_decomposition`, with `split_axis` referring to
+  the axes of the individual tensors, using a single batched `tf.linalg.qr`
+  call.
+
+  For example, if `tensor` had a shape (7, 2, 3, 4, 5) and `split_axis` was 2,
+  then `r` would have shape (7, 2, 3, 6), and `q` would have shape
+  (7, 6, 4, 5).
+
+  Args:
+    tf: The tensorflow module.
+    tensor: A stack of tensors to be decomposed.
+    split_axis: Where to split the axes of each tensor before flattening into a
+      matrix.
+
+  Returns:
+    R: Batch of left tensor factors.
+    Q: Batch of right tensor factors.
+  """
+  batch_dims = tf.shape(tensor)[:1]
+  left_dims = tf.shape(tensor)[1:split_axis + 1]
+  right_dims = tf.shape(tensor)[split_axis + 1:]
+
+  matrix_dims = tf.stack(
+      [tf.reduce_prod(left_dims), tf.reduce_prod(right_dims)])
+  tensor = tf.reshape(tensor, tf.concat([batch_dims, matrix_dims], axis=-1))
+  q, r = tf.linalg.qr(tf.linalg.adjoint(tensor))
+  r, q = tf.linalg.adjoint(r), tf.linalg.adjoint(q)  #M=r*q at this point
+  center_dims = tf.shape(r)[2:]
+  r = tf.reshape(r, tf.concat([batch_dims, left_dims, center_dims], axis=-1))
+  q = tf.reshape(q, tf.concat([batch_dims, center_dims, right_dims], axis=-1))
+  return r, q
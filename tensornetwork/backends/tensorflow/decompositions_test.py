@@ -116,6 +116,59 @@ class DecompositionsTest(tf.test.TestCase):
     np.testing.assert_almost_equal(trunc_sv_absolute, [0.1])
     np.testing.assert_almost_equal(trunc_sv_relative, [0.2, 0.1])
 
+  def test_expected_shapes_batched(self):
+    val = tf.zeros((7, 2, 3, 4, 5))
+    u, s, vh, s_rest = decompositions.svd_decomposition_batched(tf, val, 2)
+    self.assertEqual(u.shape, (7, 2, 3, 6))
+    self.assertEqual(s.shape, (7, 6))
+    self.assertEqual(vh.shape, (7, 6, 4, 5))
+    self.assertEqual(s_rest.shape, (7, 0))
+    q, r = decompositions.qr_decomposition_batched(tf, val, 2)
+    self.assertEqual(q.shape, (7, 2, 3, 6))
+    self.assertEqual(r.shape, (7, 6, 4, 5))
+    r, q = decompositions.rq_decomposition_batched(tf, val, 2)
+    self.assertEqual(r.shape, (7, 2, 3, 6))
+    self.assertEqual(q.shape, (7, 6, 4, 5))
+
+  def test_svd_decomposition_batched(self):
+    random_tensors = np.random.rand(5, 4, 3, 6)
+    u, s, vh, _ = decompositions.svd_decomposition_batched(
+        tf, random_tensors, 1)
+    for n, random_tensor in enumerate(random_tensors):
+      u_n, s_n, vh_n, _ = decompositions.svd_decomposition(
+          tf, random_tensor, 1)
+      self.assertAllClose(s[n], s_n)
+      self.assertAllClose(
+          tf.tensordot(u[n] * s[n], vh[n], ([1], [0])),
+          tf.tensordot(u_n * s_n, vh_n, ([1], [0])))
+
+  def test_max_singular_values_batched(self):
+    random_matrix = np.random.rand(10, 10)
+    unitary1, _, unitary2 = np.linalg.svd(random_matrix)
+    singular_values = np.array(range(10))
+    val = unitary1.dot(np.diag(singular_values).dot(unitary2.T))
+    u, s, vh, trun = decompositions.svd_decomposition_batched(
+        tf, np.stack([val, 2 * val]), 1, max_singular_values=7)
+    self.assertEqual(u.shape, (2, 10, 7))
+    self.assertEqual(s.shape, (2, 7))
+    self.assertAllClose(s, [np.arange(9, 2, -1), 2 * np.arange(9, 2, -1)])
+    self.assertEqual(vh.shape, (2, 7, 10))
+    self.assertAllClose(trun, [np.arange(2, -1, -1), 2 * np.arange(2, -1, -1)])
+
+  def test_qr_decomposition_batched(self):
+    random_tensors = np.random.rand(5, 4, 3, 6)
+    q, r = decompositions.qr_decomposition_batched(tf, random_tensors, 2)
+    for n, random_tensor in enumerate(random_tensors):
+      self.assertAllClose(
+          tf.tensordot(q[n], r[n], ([2], [0])), random_tensor)
+
+  def test_rq_decomposition_batched(self):
+    random_tensors = np.random.rand(5, 4, 3, 6)
+    r, q = decompositions.rq_decomposition_batched(tf, random_tensors, 1)
+    for n, random_tensor in enumerate(random_tensors):
+      self.assertAllClose(
+          tf.tensordot(r[n], q[n], ([1], [0])), random_tensor)
+
 
 if __name__ == '__main__':
   tf.test.main()
@@ -12,7 +12,10 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #pylint: disable=line-too-long
-from typing import Optional, Any, Sequence, Tuple, Type, Callable, List, Text
+import functools
+import weakref
+from typing import Optional, Any, Sequence, Tuple, Type, Callable, List, Text, Union
+import opt_einsum
 from tensornetwork.backends import base_backend
 from tensornetwork.backends.tensorflow import decompositions
 from tensornetwork.backends.tensorflow import tensordot2
@@ -22,11 +25,470 @@ from tensornetwork.backends.tensorflow import tensordot2
 import numpy as np
 Tensor = Any
 
+# Methods of `TensorFlowBackend` return `tf.Tensor` handles and must not
+# read values back to the host (`Tensor.numpy`, `int(tensor)`, ...), which
+# blocks until all pending device work is done. The only exception is the
+# list of eigenvectors returned by `eigsh_lanczos`, whose length depends on
+# the number of Krylov vectors that were computed.
+
+# Static shapes of eager tensors, keyed on `id(tensor)`. Each entry holds a
+# weak reference to its tensor, which evicts the entry once the tensor is
+# garbage collected and guards against a reused id.
+_SHAPE_CACHE = {}
+
+# Number of calls with the same signature that `TensorFlowBackend._call` runs
+# eagerly before compiling it. Compilation pays off only for recurring
+# signatures, e.g. the contractions of a sweep with a fixed bond dimension.
+_EAGER_CALLS = 2
+
+# Calls per signature counted by `TensorFlowBackend._call`, reset once it
+# holds `_MAX_CALL_COUNTS` signatures.
+_CALL_COUNTS = {}
+_MAX_CALL_COUNTS = 4096
+
+# NumPy arrays that `convert_to_tensor_nocopy` can wrap via DLPack. TensorFlow
+# kernels assume buffers aligned to `EIGEN_MAX_ALIGN_BYTES`.
+_DLPACK_DTYPES = (np.float32, np.float64, np.complex64, np.complex128)
+_DLPACK_ALIGNMENT = 64
+
+# Largest number of elements for which `eye`, `ones` and `zeros` return a
+# shared constant instead of allocating a new tensor.
+_MAX_CACHED_CONSTANT_SIZE = 4096
+
+
+# The constants are created (and stay) on the device that is current when
+# they are first requested, so `device` is part of the cache key.
+@functools.lru_cache(maxsize=128)
+def _cached_eye(tf: Any, N: int, M: Optional[int], dtype: Any,
+                device: Text) -> Tensor:
+  #pylint: disable=unused-argument
+  return tf.eye(num_rows=N, num_columns=M, dtype=dtype)
+
+
+@functools.lru_cache(maxsize=128)
+def _cached_fill(tf: Any, factory: Text, shape: Tuple[int, ...], dtype: Any,
+                 device: Text) -> Tensor:
+  #pylint: disable=unused-argument
+  return getattr(tf, factory)(shape, dtype=dtype)
+
+
+@functools.lru_cache(maxsize=512)
+def _concrete_function(tf: Any, fn: Callable, jit_compile: bool,
+                       static: Tuple[Tuple[Text, Any], ...],
+                       *signature: Any) -> Callable:
+  """Returns the (cached) concrete `tf.function` of `fn` for `signature`.
+
+  `signature` holds a `tf.TensorSpec` (dtype and static shape) for each
+  tensor operand of `fn` and `static` the `(name, value)` pairs of its
+  remaining keyword arguments, so there is one concrete function, and for
+  `jit_compile=True` one XLA executable, per `(fn, static, signature)`.
+  Calling it directly skips the signature matching (and any retracing) of
+  a plain `tf.function` call.
+
+  The cache lives at module level since `backend_factory` creates a new
+  backend object on every lookup. Use `clear_function_cache` to release
+  the cached functions.
+  """
+  kwargs = dict(static)
+
+  # A closure rather than `functools.partial`, whose bound arguments
+  # `tf.function` would inspect and turn numpy scalars into tensors.
+  def function(*tensors):
+    return fn(tf, *tensors, **kwargs)
+
+  # The helpers use explicit `tf.while_loop`/`tf.cond` and python branches
+  # on static values only, so they need no AutoGraph conversion (which
+  # fails, with a warning, on e.g. `opt_einsum` contraction expressions).
+  return tf.function(
+      function, jit_compile=jit_compile,
+      autograph=False).get_concrete_function(*signature)
+
+
+def clear_function_cache() -> None:
+  """Releases all compiled functions cached by the TensorFlow backend.
+
+  This should accompany `tf.keras.backend.clear_session()` when the default
+  graph is reset.
+  """
+  _concrete_function.cache_clear()
+  _CALL_COUNTS.clear()
+
+
+def _freeze(value: Any) -> Any:
+  """Converts nested lists and arrays to tuples, so `value` can be hashed."""
+  if isinstance(value, (list, tuple, np.ndarray)):
+    return tuple(_freeze(v) for v in value)
+  return value
+
+
+def _warmup_tensor(tf: Any, spec: Any) -> Tensor:
+  """A tensor matching `spec` to run a compiled function on once.
+
+  Random rather than zero, so that e.g. `inv` gets an invertible matrix.
+  """
+  if spec.dtype.is_floating or spec.dtype.is_complex:
+    samples = tf.random.stateless_normal(
+        spec.shape, seed=[0, 0], dtype=spec.dtype.real_dtype)
+    return tf.cast(samples, spec.dtype)
+  return tf.zeros(spec.shape, spec.dtype)
+
+
+def _static_axes(tf: Any, axes: Any) -> Any:
+  """Converts the `axes` argument of `tensordot` to (nested) python ints.
+
+  `tf.function` would turn numpy integers into tensor arguments (forcing
+  `tensordot2` onto its dynamic-shape path) and treats lists and tuples as
+  different trace keys. With plain ints each (dtype, shapes, axes)
+  combination maps to exactly one compiled `dot_general`, with the
+  transpositions folded in by XLA.
+  """
+  if isinstance(axes, (tf.Tensor, tf.Variable)):
+    return axes
+  # Not `np.ndim(axes)`, which fails on ragged axes like `[[0, 1], [0]]`
+  # before `tensordot2` can report the mismatch.
+  if isinstance(axes, (int, np.integer)) or (isinstance(axes, np.ndarray) and
+                                             axes.ndim == 0):
+    return int(axes)
+  return tuple(
+      int(ax) if np.ndim(ax) == 0 else tuple(int(i) for i in ax)
+      for ax in axes)
+
+
+def _contraction_axes(axes: Any, rank_a: int,
+                      rank_b: int) -> Tuple[List[int], List[int]]:
+  """The contracted axes of `a` and `b` for static `axes` of `tensordot`."""
+  if isinstance(axes, int):
+    return list(range(rank_a - axes, rank_a)), list(range(axes))
+  axes_a, axes_b = [[ax] if isinstance(ax, int) else list(ax) for ax in axes]
+  return ([ax % rank_a for ax in axes_a], [ax % rank_b for ax in axes_b])
+
+
+def _tensordot(tf: Any, a: Tensor, b: Tensor, axes: Any) -> Tensor:
+  return tensordot2.tensordot(tf, a, b, axes)
+
+
+def _cast_floating(tf: Any, tensor: Tensor, dtype: Any) -> Tensor:
+  """Casts `tensor` to `dtype` if it is a `float32` or `float64` tensor."""
+  if tensor.dtype not in (tf.float32, tf.float64):
+    return tensor
+  return tf.cast(tensor, dtype)
+
+
+def _mixed_precision_tensordot(tf: Any, a: Tensor, b: Tensor, axes: Any,
+                               compute_dtype: Any) -> Tensor:
+  """`_tensordot` with floating point inputs cast to `compute_dtype`.
+
+  The result is cast back to the dtype of the higher precision input.
+  """
+  dtype = b.dtype if a.dtype == compute_dtype else a.dtype
+  result = tensordot2.tensordot(tf, _cast_floating(tf, a, compute_dtype),
+                                _cast_floating(tf, b, compute_dtype), axes)
+  return tf.cast(result, dtype)
+
+
+@functools.lru_cache(maxsize=128)
+def _einsum_expression(expression: str, shapes: Tuple[Tuple[int, ...], ...]
+                      ) -> Callable:
+  """Finds (and caches) a greedy contraction path for an einsum."""
+  return opt_einsum.contract_expression(expression, *shapes, optimize="greedy")
+
+
+def _einsum(tf: Any, *tensors: Tensor, expression: str) -> Tensor:
+  tensors = [tf.convert_to_tensor(t) for t in tensors]
+  # `tf.einsum` contracts pairwise from left to right, which can be very
+  # costly for more than two operands. For those we use a contraction path
+  # from `opt_einsum` instead, provided all shapes are static.
+  if len(tensors) < 3 or not all(
+      t.shape.is_fully_defined() for t in tensors):
+    return tf.einsum(expression, *tensors)
+  shapes = tuple(tuple(t.shape.as_list()) for t in tensors)
+  return _einsum_expression(expression, shapes)(*tensors, backend="tensorflow")
+
+
+# The elementwise helpers call `tf.raw_ops` directly, which skips the
+# dispatch logic behind the python operators. The ops broadcast like their
+# operator counterparts, but require both operands to have the same dtype
+# (see `TensorFlowBackend._operands`).
+def _addition(tf: Any, tensor1: Tensor, tensor2: Tensor) -> Tensor:
+  return tf.raw_ops.AddV2(x=tensor1, y=tensor2)
+
+
+def _subtraction(tf: Any, tensor1: Tensor, tensor2: Tensor) -> Tensor:
+  return tf.raw_ops.Sub(x=tensor1, y=tensor2)
+
+
+def _is_bool(tf: Any, tensor: Tensor) -> bool:
+  dtype = getattr(tensor, "dtype", None)
+  if dtype is None:
+    return isinstance(tensor, bool)
+  return tf.as_dtype(dtype) == tf.bool
+
+
+def _multiply(tf: Any, tensor1: Tensor, tensor2: Tensor) -> Tensor:
+  if _is_bool(tf, tensor1) or _is_bool(tf, tensor2):
+    # `Mul` has no bool kernel, `*` computes a logical and.
+    return tensor1 * tensor2
+  return tf.raw_ops.Mul(x=tensor1, y=tensor2)
+
+
+def _is_integer(tf: Any, tensor: Tensor) -> bool:
+  dtype = getattr(tensor, "dtype", None)
+  if dtype is None:
+    return isinstance(tensor, int)
+  return tf.as_dtype(dtype).is_integer
+
+
+def _divide(tf: Any, tensor1: Tensor, tensor2: Tensor) -> Tensor:
+  if _is_integer(tf, tensor1) or _is_integer(tf, tensor2):
+    # `/` casts integers to floats first (true division).
+    return tensor1 / tensor2
+  return tf.raw_ops.RealDiv(x=tensor1, y=tensor2)
+
+
+def _broadcast_right_multiplication(tf: Any, tensor1: Tensor,
+                                    tensor2: Tensor) -> Tensor:
+  #pylint: disable=unused-argument
+  return tensor1 * tensor2
+
+
+def _broadcast_left_multiplication(tf: Any, tensor1: Tensor,
+                                   tensor2: Tensor) -> Tensor:
+  # A static broadcast shape (rather than one built from `tf.shape`) keeps
+  # shape inference intact, so reshape and multiply fuse into one kernel.
+  t1_broadcast_shape = [-1] + [1] * (len(tensor2.shape) - 1)
+  return tensor2 * tf.reshape(tensor1, t1_broadcast_shape)
+
+
+def _sincos(tf: Any, tensor: Tensor) -> Tuple[Tensor, Tensor]:
+  return tf.math.sin(tensor), tf.math.cos(tensor)
+
+
+def _frobenius_norm(tf: Any, tensor: Tensor) -> Tensor:
+  # Unlike `tf.linalg.norm`, this skips the `ord` dispatch and fuses into a
+  # single reduction when traced into a compiled function. The result keeps
+  # the dtype of `tensor`, as `tf.linalg.norm` does.
+  return tf.cast(
+      tf.sqrt(tf.reduce_sum(tf.math.real(tensor * tf.math.conj(tensor)))),
+      tensor.dtype)
+
+
+def _expm(tf: Any, matrix: Tensor) -> Tensor:
+  return tf.linalg.expm(matrix)
+
+
+def _mixed_precision_expm(tf: Any, matrix: Tensor, accum_dtype: Any) -> Tensor:
+  # `tf.linalg.expm` has no half precision kernels.
+  return tf.cast(
+      tf.linalg.expm(_cast_floating(tf, matrix, accum_dtype)), matrix.dtype)
+
+
+def _mixed_precision_svd(tf: Any, tensor: Tensor, split_axis: int,
+                         max_singular_values: Optional[int],
+                         max_truncation_error: Optional[float], relative: bool,
+                         accum_dtype: Any) -> Tuple[Tensor, Tensor, Tensor,
+                                                    Tensor]:
+  """`decompositions.svd_decomposition` computed in `accum_dtype`.
+
+  There are no half precision SVD kernels. All results are cast back to
+  the dtype of `tensor`, like the result of `_mixed_precision_tensordot`,
+  so they can be combined with each other and with `tensor`.
+  """
+  results = decompositions.svd_decomposition(
+      tf, _cast_floating(tf, tensor, accum_dtype), split_axis,
+      max_singular_values, max_truncation_error, relative)
+  return tuple(tf.cast(result, tensor.dtype) for result in results)
+
+
+def _eigh(tf: Any, matrix: Tensor) -> Tuple[Tensor, Tensor]:
+  return tf.linalg.eigh(matrix)
+
+
+def _eigsh_lanczos(tf: Any, initial_state: Tensor, *args: Tensor, A: Callable,
+                   num_krylov_vecs: int, numeig: int, tol: float,
+                   delta: float, ndiag: int, reorthogonalize: bool,
+                   compiled: bool) -> Tuple[Tensor, Tensor, Tensor]:
+  """Lanczos iteration of `TensorFlowBackend.eigsh_lanczos` as one graph.
+
+  The iteration is a `tf.while_loop` without any host synchronization per
+  step. `compiled` tells whether it is compiled by XLA, and selects
+
+  * the storage of the Krylov vectors: a fixed `[num_krylov_vecs, N]`
+    buffer, which XLA updates in place, or a `tf.TensorArray` growing with
+    the number of iterations, since outside of XLA every update of the
+    buffer would copy all of it.
+  * how the convergence checks find the lowest eigenvalues of the
+    tridiagonal operator: by bisection, which is fast under XLA (whose
+    dense `eigh` is slow), or by a dense `eigvalsh`, which is fast outside
+    of XLA (where bisection runs op by op).
+
+  Returns:
+    eigvals: The `numeig` lowest eigenvalues.
+    eigvecs: The corresponding eigenvectors, stacked along the first axis.
+    num_vecs: The number of Krylov vectors that were computed.
+  """
+  shape = tf.shape(initial_state)
+  dtype = initial_state.dtype
+  real_dtype = dtype.real_dtype
+
+  def norm(vector):
+    # `tf.linalg.norm` of a complex tensor has a complex dtype.
+    return tf.math.real(tf.linalg.norm(vector))
+
+  def tridiagonal(alphas, betas, num_vecs):
+    """Diagonal and off-diagonal of the tridiagonal operator.
+
+    Both are padded to `num_krylov_vecs`. The padding is decoupled from the
+    first `num_vecs` rows and columns and shifted above their Gershgorin
+    bound, so the lowest eigenpairs are those of the unpadded operator.
+    """
+    index = tf.range(num_krylov_vecs)
+    bound = tf.reduce_max(tf.abs(alphas)) + 2 * tf.reduce_max(betas) + 1
+    diagonal = tf.where(index < num_vecs, alphas, bound)
+    off_diagonal = tf.where((index > 0) & (index < num_vecs), betas,
+                            tf.zeros_like(betas))[1:]
+    return diagonal, off_diagonal
+
+  def dense(diagonal, off_diagonal):
+    return (tf.linalg.diag(diagonal) + tf.linalg.diag(off_diagonal, k=1) +
+            tf.linalg.diag(off_diagonal, k=-1))
+
+  def cond(it, vector_n, norm_vector_n, krylov_vecs, alphas, betas,
+           eigvals_old, converged):
+    del vector_n, krylov_vecs, alphas, betas, eigvals_old
+    return ((it < num_krylov_vecs) & (norm_vector_n >= delta) &
+            tf.logical_not(converged))
+
+  def body(it, vector_n, norm_vector_n, krylov_vecs, alphas, betas,
+           eigvals_old, converged):
+    del converged
+    betas = tf.tensor_scatter_nd_update(betas, [[it]], [norm_vector_n])
+    vector_n = vector_n / tf.cast(norm_vector_n, dtype)
+    if reorthogonalize:
+      # Unused rows of the buffer are zero and don't contribute.
+      basis = krylov_vecs if compiled else krylov_vecs.stack()
+      overlaps = tf.linalg.matvec(tf.math.conj(basis), vector_n)
+      vector_n -= tf.linalg.matvec(basis, overlaps, transpose_a=True)
+    if compiled:
+      krylov_vecs = tf.tensor_scatter_nd_update(krylov_vecs, [[it]],
+                                                vector_n[None])
+    else:
+      krylov_vecs = krylov_vecs.write(it, vector_n)
+    A_vector_n = tf.reshape(A(tf.reshape(vector_n, shape), *args), [-1])
+    alpha = tf.math.real(tf.reduce_sum(tf.math.conj(vector_n) * A_vector_n))
+    alphas = tf.tensor_scatter_nd_update(alphas, [[it]], [alpha])
+
+    def check_convergence():
+      if compiled:
+        # Bisection for the lowest `numeig` eigenvalues only.
+        eigvals = tf.linalg.eigh_tridiagonal(
+            *tridiagonal(alphas, betas, it + 1),
+            eigvals_only=True,
+            select='i',
+            select_range=[0, numeig - 1])
+      else:
+        eigvals = tf.linalg.eigvalsh(
+            dense(*tridiagonal(alphas, betas, it + 1)))[:numeig]
+      return eigvals, tf.linalg.norm(eigvals - eigvals_old) < tol
+
+    eigvals_old, converged = tf.cond(
+        (it > 0) & (it % ndiag == 0) & (it + 1 >= numeig), check_convergence,
+        lambda: (eigvals_old, tf.constant(False)))
+
+    if compiled:
+      previous_vector = tf.gather(krylov_vecs, tf.maximum(it - 1, 0))
+    else:
+      previous_vector = krylov_vecs.read(tf.maximum(it - 1, 0))
+    previous_norm = tf.where(it > 0, norm_vector_n, tf.zeros_like(alpha))
+    A_vector_n -= vector_n * tf.cast(alpha, dtype)
+    A_vector_n -= previous_vector * tf.cast(previous_norm, dtype)
+    return (it + 1, A_vector_n, norm(A_vector_n), krylov_vecs,
+            alphas, betas, eigvals_old, converged)
+
+  vector_n = tf.reshape(initial_state, [-1])
+  vector_n = vector_n / tf.cast(tf.linalg.norm(vector_n), dtype)
+  if compiled:
+    krylov_vecs = tf.zeros([num_krylov_vecs, tf.size(vector_n)], dtype)
+  else:
+    krylov_vecs = tf.TensorArray(
+        dtype,
+        size=0,
+        dynamic_size=True,
+        clear_after_read=False,
+        element_shape=vector_n.shape)
+  loop_vars = (tf.constant(0), vector_n, norm(vector_n), krylov_vecs,
+               tf.zeros([num_krylov_vecs], real_dtype),
+               tf.zeros([num_krylov_vecs], real_dtype),
+               tf.fill([numeig], tf.constant(np.nan, real_dtype)),
+               tf.constant(False))
+  num_vecs, _, _, krylov_vecs, alphas, betas, _, _ = tf.while_loop(
+      cond, body, loop_vars)
+
+  eigvals, u = tf.linalg.eigh(dense(*tridiagonal(alphas, betas, num_vecs)))
+  if not compiled:
+    # The lowest eigenvectors vanish on the padding of the operator.
+    krylov_vecs = krylov_vecs.stack()
+    u = u[:num_vecs]
+  eigvecs = tf.linalg.matmul(
+      tf.cast(u[:, :numeig], dtype), krylov_vecs, transpose_a=True)
+  eigvecs /= tf.cast(tf.linalg.norm(eigvecs, axis=1, keepdims=True), dtype)
+  eigvecs = tf.reshape(eigvecs, tf.concat([[numeig], shape], axis=0))
+  return tf.cast(eigvals[:numeig], dtype), eigvecs, num_vecs
+
+
+class CachedTensor:
+  """A tensor that is contracted repeatedly along the same axes.
+
+  `TensorFlowBackend.tensordot` transposes a `CachedTensor` such that its
+  contracted axes are contiguous in memory (last for the left and first for
+  the right operand), which lets the contraction run as a single `matmul`.
+  The transposed copy is stored in the wrapper, so it is made only once.
+  """
+
+  def __init__(self, tensor: Tensor):
+    self.tensor = tensor
+    self.transposed = {}
+
+  @property
+  def shape(self) -> Any:
+    return self.tensor.shape
+
+  @property
+  def dtype(self) -> Any:
+    return self.tensor.dtype
+
 
 class TensorFlowBackend(base_backend.BaseBackend):
   """See base_backend.BaseBackend for documentation."""
 
-  def __init__(self):
+  def __init__(self,
+               use_xla: bool = True,
+               compute_dtype: Optional[Any] = None,
+               accum_dtype: Any = "float32",
+               synchronous: Optional[bool] = None):
+    """
+    Args:
+      use_xla: If `True`, contractions, `expm` and other composite ops
+        are dispatched to XLA-compiled `tf.function`s, which fuses chains of
+        ops into single kernels. Compiled functions are cached per op,
+        dtype and exact shape, and each new shape costs a compilation
+        (tens of milliseconds for a contraction). So an op only gets
+        compiled for a shape once it has been called with that shape
+        twice before, and runs eagerly until then. This pays off when the
+        same shapes recur, e.g. in sweeps with a fixed bond dimension. Set
+        to `False` to run every op eagerly, e.g. for debugging.
+      compute_dtype: An optional reduced precision dtype (e.g.
+        `tf.bfloat16`). If given, `float32` and `float64` inputs of
+        `tensordot` and `outer_product` are cast to `compute_dtype` and the
+        result is cast back to the input dtype.
+      accum_dtype: The dtype in which `expm` and `svd_decomposition` are
+        computed if `compute_dtype` is given, since they have no half
+        precision kernels. Their results are cast back to the input dtype.
+      synchronous: If given, sets whether TensorFlow executes eager ops
+        synchronously (see `tf.config.experimental.set_synchronous_execution`).
+        With `False`, ops are enqueued and return immediately, and errors
+        may surface at a later op. This is a process wide setting. By
+        default it is left unchanged.
+    """
     super(TensorFlowBackend, self).__init__()
     try:
       #pylint: disable=import-outside-toplevel
@@ -35,16 +497,193 @@ class TensorFlowBackend(base_backend.BaseBackend):
       raise ImportError("Tensorflow not installed, please switch to a "
                         "different backend or install Tensorflow.")
     self.tf = tf
+    # The eager context holds the device of the enclosing `tf.device`
+    # scope, on which the constants of `eye`, `ones` and `zeros` are cached.
+    # There is no public API for it, so if the private one changes in a
+    # TensorFlow release, the constants are not cached at all.
+    try:
+      #pylint: disable=import-outside-toplevel
+      from tensorflow.python.eager import context
+      self._context = context.context()
+    except (ImportError, AttributeError):
+      self._context = None
+    if not hasattr(self._context, "device_name"):
+      self._context = None
     self.name = "tensorflow"
+    self.use_xla = use_xla
+    self.compute_dtype = (
+        tf.as_dtype(compute_dtype) if compute_dtype is not None else None)
+    self.accum_dtype = tf.as_dtype(accum_dtype)
+    if synchronous is not None:
+      tf.config.experimental.set_synchronous_execution(synchronous)
+    # Bound once, to save the attribute lookups on every call.
+    self._inv = tf.linalg.inv
+    self._sin = tf.math.sin
+    self._cos = tf.math.cos
+    self._exp = tf.math.exp
+    self._log = tf.math.log
+    self._sqrt = tf.sqrt
+    self._conj = tf.math.conj
+    self._trace = tf.linalg.trace
+    self._diag = tf.linalg.diag
+    self._where = tf.where
+    self._shape = tf.shape
+    self._reshape = tf.reshape
+    self._transpose = tf.transpose
+    self._slice = tf.slice
+    self._concat = tf.concat
+    self._reduce_prod = tf.reduce_prod
+    self._convert = tf.convert_to_tensor
+    self._from_dlpack = tf.experimental.dlpack.from_dlpack
+    self._aot_cache = {}
+
+  def _call(self,
+            fn: Callable,
+            *tensors: Any,
+            jit_compile: bool = True,
+            eager_calls: Optional[int] = None,
+            **static: Any) -> Any:
+    """Calls the module-level helper `fn` through a cached concrete function.
+
+    The first `eager_calls` calls of each signature (`fn`, `static` and
+    dtypes and shapes of `tensors`) run `fn` eagerly, so that compilation
+    is spent only on signatures that recur.
+
+    Args:
+      fn: The helper, taking the tensorflow module as first argument.
+      *tensors: The tensor operands of `fn`. Numpy arrays, python scalars
+        and lists are converted to tensors.
+      jit_compile: Whether to compile `fn` with XLA. Ops with inaccurate or
+        missing XLA kernels still benefit from running as a single graph
+        function.
+      eager_calls: The number of calls of a signature to run eagerly before
+        compiling it. Defaults to `_EAGER_CALLS`.
+      **static: The remaining arguments of `fn`, passed by keyword. They are
+        fixed at trace time, so they have to be hashable, and each distinct
+        value gets its own compiled function.
+    Returns:
+      The output of `fn`.
+    """
+    if not self.use_xla:
+      return fn(self.tf, *tensors, **static)
+    tensors = [self._convert(tensor) for tensor in tensors]
+    signature = tuple(
+        self.tf.TensorSpec(tensor.shape, tensor.dtype) for tensor in tensors)
+    static_items = tuple(sorted(static.items()))
+    if eager_calls is None:
+      eager_calls = _EAGER_CALLS
+    if eager_calls > 0:
+      key = (fn, jit_compile, static_items) + signature
+      count = _CALL_COUNTS.get(key, 0)
+      if count < eager_calls:
+        if len(_CALL_COUNTS) >= _MAX_CALL_COUNTS:
+          _CALL_COUNTS.clear()
+        _CALL_COUNTS[key] = count + 1
+        return fn(self.tf, *tensors, **static)
+    return _concrete_function(self.tf, fn, jit_compile, static_items,
+                              *signature)(*tensors)
+
+  def aot_compile(self, op_name: Text, *args: Any) -> Callable:
+    """Compiles the backend method `op_name` for fixed input shapes.
+
+    The method is traced into a single graph function, which is run once
+    so that XLA compiles all of its kernels ahead of the first real call.
+    Calling the result skips the Python dispatch of the method entirely,
+    e.g. for contractions that are repeated with the same shapes.
+
+    Args:
+      op_name: The name of a backend method, e.g. `"tensordot"`.
+      *args: The arguments of the method. Tensor arguments are given as
+        `tf.TensorSpec`s with fully defined shapes, all other arguments
+        (e.g. `axes`) are fixed at compile time.
+    Returns:
+      A callable taking the tensor arguments of the method, in order.
+    Raises:
+      AttributeError: If the backend has no method `op_name`.
+      ValueError: If the shape of a `tf.TensorSpec` is not fully defined.
+    """
+    key = (op_name,) + tuple(_freeze(arg) for arg in args)
+    if key in self._aot_cache:
+      return self._aot_cache[key]
+    method = getattr(self, op_name)
+    specs = [arg for arg in args if isinstance(arg, self.tf.TensorSpec)]
+    for spec in specs:
+      if not spec.shape.is_fully_defined():
+        raise ValueError("aot_compile requires fully defined shapes, got "
+                         "{}".format(spec))
+
+    def fn(*tensors):
+      tensors = iter(tensors)
+      return method(*[
+          next(tensors) if isinstance(arg, self.tf.TensorSpec) else arg
+          for arg in args
+      ])
+
+    compiled = self.tf.function(
+        fn, autograph=False).get_concrete_function(*specs)
+    compiled(*[_warmup_tensor(self.tf, spec) for spec in specs])
+    self._aot_cache[key] = compiled
+    return compiled
+
+  def tensordot(self, a: Union[Tensor, CachedTensor],
+                b: Union[Tensor, CachedTensor], axes: Sequence[Sequence[int]]):
+    axes = _static_axes(self.tf, axes)
+    if isinstance(a, CachedTensor) or isinstance(b, CachedTensor):
+      a, b, axes = self._contiguous_layout(a, b, axes)
+    if isinstance(axes, (self.tf.Tensor, self.tf.Variable)):
+      # Axes given as tensors take the dynamic path of `tensordot2`.
+      return _tensordot(self.tf, a, b, axes)
+    if self.compute_dtype is not None:
+      return self._call(
+          _mixed_precision_tensordot,
+          a,
+          b,
+          axes=axes,
+          compute_dtype=self.compute_dtype)
+    return self._call(_tensordot, a, b, axes=axes)
+
+  def _contiguous_layout(self, a: Union[Tensor, CachedTensor],
+                         b: Union[Tensor, CachedTensor],
+                         axes: Any) -> Tuple[Tensor, Tensor, Any]:
+    """Transposes `CachedTensor` operands of `tensordot` into matmul layout.
 
-  def tensordot(self, a: Tensor, b: Tensor, axes: Sequence[Sequence[int]]):
-    return tensordot2.tensordot(self.tf, a, b, axes)
+    Returns:
+      The operands as tensors and the contracted axes after transposition.
+    """
+    if isinstance(axes, (self.tf.Tensor, self.tf.Variable)):
+      return self._unwrap(a), self._unwrap(b), axes
+    axes_a, axes_b = _contraction_axes(axes, len(a.shape), len(b.shape))
+    if isinstance(a, CachedTensor):
+      free = [i for i in range(len(a.shape)) if i not in axes_a]
+      a = self._cached_transpose(a, tuple(free + axes_a))
+      axes_a = list(range(len(free), len(free) + len(axes_a)))
+    if isinstance(b, CachedTensor):
+      free = [i for i in range(len(b.shape)) if i not in axes_b]
+      b = self._cached_transpose(b, tuple(axes_b + free))
+      axes_b = list(range(len(axes_b)))
+    return a, b, (tuple(axes_a), tuple(axes_b))
+
+  def _cached_transpose(self, tensor: CachedTensor,
+                        perm: Tuple[int, ...]) -> Tensor:
+    if perm == tuple(range(len(perm))):
+      return tensor.tensor
+    if not self.tf.executing_eagerly():
+      # Symbolic tensors must not outlive the graph they belong to.
+      return self._transpose(tensor.tensor, perm)
+    if perm not in tensor.transposed:
+      tensor.transposed[perm] = self._transpose(tensor.tensor, perm)
+    return tensor.transposed[perm]
+
+  def _unwrap(self, tensor: Union[Tensor, CachedTensor]) -> Tensor:
+    if isinstance(tensor, CachedTensor):
+      return tensor.tensor
+    return tensor
 
   def reshape(self, tensor: Tensor, shape: Tensor):
-    return self.tf.reshape(tensor, shape)
+    return self._reshape(tensor, shape)
 
   def transpose(self, tensor, perm):
-    return self.tf.transpose(tensor, perm)
+    return self._transpose(tensor, perm)
 
   def slice(self,
             tensor: Tensor,
@@ -53,7 +692,7 @@ class TensorFlowBackend(base_backend.BaseBackend):
     if len(start_indices) != len(slice_sizes):
       raise ValueError("Lengths of start_indices and slice_sizes must be"
                        "identical.")
-    return self.tf.slice(tensor, start_indices, slice_sizes)
+    return self._slice(tensor, start_indices, slice_sizes)
 
   def svd_decomposition(self,
                         tensor: Tensor,
@@ -62,13 +701,26 @@ class TensorFlowBackend(base_backend.BaseBackend):
                         max_truncation_error: Optional[float] = None,
                         relative: Optional[bool] = False
                        ) -> Tuple[Tensor, Tensor, Tensor, Tensor]:
-    return decompositions.svd_decomposition(
-        self.tf,
+    # XLA's SVD is a Jacobi solver that is far less accurate than the
+    # LAPACK/cuSolver kernels, so this runs as a plain graph function.
+    if self.compute_dtype is not None:
+      return self._call(
+          _mixed_precision_svd,
+          tensor,
+          split_axis=split_axis,
+          max_singular_values=max_singular_values,
+          max_truncation_error=max_truncation_error,
+          relative=relative,
+          accum_dtype=self.accum_dtype,
+          jit_compile=False)
+    return self._call(
+        decompositions.svd_decomposition,
         tensor,
-        split_axis,
-        max_singular_values,
-        max_truncation_error,
-        relative=relative)
+        split_axis=split_axis,
+        max_singular_values=max_singular_values,
+        max_truncation_error=max_truncation_error,
+        relative=relative,
+        jit_compile=False)
 
   def qr_decomposition(self, tensor: Tensor,
                        split_axis: int) -> Tuple[Tensor, Tensor]:
@@ -78,107 +730,262 @@ class TensorFlowBackend(base_backend.BaseBackend):
                        split_axis: int) -> Tuple[Tensor, Tensor]:
     return decompositions.rq_decomposition(self.tf, tensor, split_axis)
 
+  def svd_decomposition_batched(
+      self,
+      tensors: Union[Tensor, Sequence[Tensor]],
+      split_axis: int,
+      max_singular_values: Optional[int] = None
+  ) -> Tuple[Tensor, Tensor, Tensor, Tensor]:
+    """Batched version of `svd_decomposition`.
+
+    Args:
+      tensors: Either a sequence of equally shaped tensors or a single tensor
+        holding them stacked along its first axis.
+      split_axis: Where to split the axes of each tensor before flattening
+        into a matrix.
+      max_singular_values: The number of singular values to keep, or `None`
+        to keep them all.
+    Returns:
+      `u, s, vh, s_rest`, each stacked along the first axis. See
+      `decompositions.svd_decomposition_batched`.
+    """
+    return decompositions.svd_decomposition_batched(
+        self.tf, self._stack(tensors), split_axis, max_singular_values)
+
+  def qr_decomposition_batched(self, tensors: Union[Tensor, Sequence[Tensor]],
+                               split_axis: int) -> Tuple[Tensor, Tensor]:
+    """Batched version of `qr_decomposition`.
+
+    Args:
+      tensors: Either a sequence of equally shaped tensors or a single tensor
+        holding them stacked along its first axis.
+      split_axis: Where to split the axes of each tensor before flattening
+        into a matrix.
+    Returns:
+      `q, r`, each stacked along the first axis.
+    """
+    return decompositions.qr_decomposition_batched(self.tf,
+                                                   self._stack(tensors),
+                                                   split_axis)
+
+  def rq_decomposition_batched(self, tensors: Union[Tensor, Sequence[Tensor]],
+                               split_axis: int) -> Tuple[Tensor, Tensor]:
+    """Batched version of `rq_decomposition`.
+
+    Args:
+      tensors: Either a sequence of equally shaped tensors or a single tensor
+        holding them stacked along its first axis.
+      split_axis: Where to split the axes of each tensor before flattening
+        into a matrix.
+    Returns:
+      `r, q`, each stacked along the first axis.
+    """
+    return decompositions.rq_decomposition_batched(self.tf,
+                                                   self._stack(tensors),
+                                                   split_axis)
+
+  def _stack(self, tensors: Union[Tensor, Sequence[Tensor]]) -> Tensor:
+    if isinstance(tensors, (list, tuple)):
+      return self.tf.stack(tensors)
+    return tensors
+
   def shape_concat(self, values: Tensor, axis: int) -> Tensor:
-    return self.tf.concat(values, axis)
+    return self._concat(values, axis)
 
   def shape_tensor(self, tensor: Tensor) -> Tensor:
-    return self.tf.shape(tensor)
+    return self._shape(tensor)
 
   def shape_tuple(self, tensor: Tensor) -> Tuple[Optional[int], ...]:
-    return tuple(tensor.shape.as_list())
+    key = id(tensor)
+    entry = _SHAPE_CACHE.get(key)
+    if entry is not None and entry[0]() is tensor:
+      return entry[1]
+    shape = tuple(tensor.shape.as_list())
+    # Only eager tensors are cached: the static shape of a graph tensor can
+    # still be refined with `set_shape`.
+    if (isinstance(tensor, self.tf.Tensor) and self.tf.executing_eagerly() and
+        tensor.shape.is_fully_defined()):
+      _SHAPE_CACHE[key] = (weakref.ref(
+          tensor, lambda _: _SHAPE_CACHE.pop(key, None)), shape)
+    return shape
 
   def sparse_shape(self, tensor: Tensor) -> Tuple[Optional[int], ...]:
     return self.shape_tuple(tensor)
 
   def shape_prod(self, values: Tensor) -> Tensor:
-    return self.tf.reduce_prod(values)
+    return self._reduce_prod(values)
 
   def sqrt(self, tensor: Tensor) -> Tensor:
-    return self.tf.sqrt(tensor)
+    return self._sqrt(tensor)
 
   def diag(self, tensor: Tensor) -> Tensor:
-    return self.tf.linalg.diag(tensor)
+    return self._diag(tensor)
 
   def convert_to_tensor(self, tensor: Tensor) -> Tensor:
-    result = self.tf.convert_to_tensor(tensor)
+    result = self._convert(tensor)
     return result
 
+  def convert_to_tensor_nocopy(self, array: np.ndarray) -> Tensor:
+    """Wraps `array` in a `tf.Tensor` without copying it, via DLPack.
+
+    The tensor shares its buffer with `array`: modifying `array` afterwards
+    changes the tensor, which breaks the assumption that tensors are
+    immutable. The caller has to keep `array` unchanged for the lifetime of
+    the tensor.
+
+    Args:
+      array: A C-contiguous, writeable numpy array of dtype `float32`,
+        `float64`, `complex64` or `complex128`, whose buffer is aligned to
+        64 bytes (numpy's default allocations usually are not).
+    Returns:
+      A `tf.Tensor` sharing its buffer with `array`.
+    Raises:
+      ValueError: If `array` cannot be shared with TensorFlow.
+    """
+    if not (isinstance(array, np.ndarray) and array.flags.c_contiguous and
+            array.flags.writeable and array.dtype in _DLPACK_DTYPES and
+            array.ctypes.data % _DLPACK_ALIGNMENT == 0):
+      raise ValueError(
+          "Only C-contiguous, writeable float32, float64, complex64 or "
+          "complex128 arrays aligned to {} bytes can be converted without "
+          "a copy.".format(_DLPACK_ALIGNMENT))
+    return self._from_dlpack(array.__dlpack__())
+
   def trace(self, tensor: Tensor) -> Tensor:
-    return self.tf.linalg.trace(tensor)
+    return self._trace(tensor)
 
   def outer_product(self, tensor1: Tensor, tensor2: Tensor) -> Tensor:
-    return tensordot2.tensordot(self.tf, tensor1, tensor2, 0)
+    tensor1, tensor2 = self._unwrap(tensor1), self._unwrap(tensor2)
+    if self.compute_dtype is not None:
+      return self._call(
+          _mixed_precision_tensordot,
+          tensor1,
+          tensor2,
+          axes=0,
+          compute_dtype=self.compute_dtype)
+    return self._call(_tensordot, tensor1, tensor2, axes=0)
 
   def einsum(self, expression: str, *tensors: Tensor) -> Tensor:
-    return self.tf.einsum(expression, *tensors)
+    return self._call(_einsum, *tensors, expression=expression)
 
   def norm(self, tensor: Tensor) -> Tensor:
-    return self.tf.linalg.norm(tensor)
+    # A single reduction, which runs eagerly like the elementwise ops: it is
+    # applied to tensors of all shapes, each of which would be compiled.
+    return _frobenius_norm(self.tf, self._convert(tensor))
+
+  def _is_cacheable(self, shape: Any) -> bool:
+    """Whether a constant of `shape` can be shared between calls.
+
+    Eager tensors are immutable, so small ones can be handed out repeatedly.
+    Graph tensors belong to the graph that created them and are never cached.
+    """
+    return (self._context is not None and isinstance(shape, tuple) and
+            all(isinstance(dim, int) for dim in shape) and
+            np.prod(shape) <= _MAX_CACHED_CONSTANT_SIZE and
+            self.tf.executing_eagerly())
 
   def eye(self,
           N: int,
           dtype: Optional[Type[np.number]] = None,
           M: Optional[int] = None) -> Tensor:
     dtype = dtype if dtype is not None else self.tf.float64
+    if self._is_cacheable((N, M if M is not None else N)):
+      return _cached_eye(self.tf, N, M, dtype, self._context.device_name)
     return self.tf.eye(num_rows=N, num_columns=M, dtype=dtype)
 
   def ones(self,
            shape: Tuple[int, ...],
            dtype: Optional[Type[np.number]] = None) -> Tensor:
     dtype = dtype if dtype is not None else self.tf.float64
+    if isinstance(shape, list):
+      shape = tuple(shape)
+    if self._is_cacheable(shape):
+      return _cached_fill(self.tf, "ones", shape, dtype,
+                          self._context.device_name)
     return self.tf.ones(shape=shape, dtype=dtype)
 
   def zeros(self,
             shape: Tuple[int, ...],
             dtype: Optional[Type[np.number]] = None) -> Tensor:
     dtype = dtype if dtype is not None else self.tf.float64
+    if isinstance(shape, list):
+      shape = tuple(shape)
+    if self._is_cacheable(shape):
+      return _cached_fill(self.tf, "zeros", shape, dtype,
+                          self._context.device_name)
     return self.tf.zeros(shape, dtype=dtype)
 
+  def _random(self, sampler: Text, shape: Tuple[int, ...],
+              dtype: Type[np.number], seed: Optional[int],
+              **kwargs: Any) -> Tensor:
+    """Draws random numbers without touching the global seed.
+
+    Seeded draws use the stateless ops (no generator state to create or
+    lock), unseeded draws advance TensorFlow's global `tf.random.Generator`.
+    For complex `dtype`, real and imaginary parts come from a single draw
+    of shape `shape + (2,)`.
+    """
+    dtype = self.tf.as_dtype(dtype)
+    real_dtype = dtype.real_dtype
+    sample_shape = tuple(shape) + (2,) if dtype.is_complex else shape
+    if seed is not None:
+      samples = getattr(self.tf.random, "stateless_" + sampler)(
+          shape=sample_shape, seed=[seed, 0], dtype=real_dtype, **kwargs)
+    else:
+      generator = self.tf.random.get_global_generator()
+      samples = getattr(generator, sampler)(
+          shape=sample_shape, dtype=real_dtype, **kwargs)
+    if dtype.is_complex:
+      return self.tf.complex(samples[..., 0], samples[..., 1])
+    return samples
+
   def randn(self,
             shape: Tuple[int, ...],
             dtype: Optional[Type[np.number]] = None,
             seed: Optional[int] = None) -> Tensor:
-    if seed:
-      self.tf.random.set_seed(seed)
+    """Return a tensor of normally distributed random numbers.
 
+    Args:
+      shape: The shape of the returned tensor.
+      dtype: The dtype of the returned tensor. Defaults to `tf.float64`.
+      seed: The seed for the random numbers. Draws with the same `seed` are
+        identical. Without a `seed`, the numbers are drawn from
+        `tf.random.get_global_generator()`, which `tf.random.set_seed` does
+        not reset. Use `tf.random.set_global_generator(
+        tf.random.Generator.from_seed(...))` to make them reproducible.
+    """
     dtype = dtype if dtype is not None else self.tf.float64
-    if (dtype is self.tf.complex128) or (dtype is self.tf.complex64):
-      return self.tf.complex(
-          self.tf.random.normal(shape=shape, dtype=dtype.real_dtype),
-          self.tf.random.normal(shape=shape, dtype=dtype.real_dtype))
-    return self.tf.random.normal(shape=shape, dtype=dtype)
+    return self._random("normal", shape, dtype, seed)
 
   def random_uniform(self,
                      shape: Tuple[int, ...],
                      boundaries: Optional[Tuple[float, float]] = (0.0, 1.0),
                      dtype: Optional[Type[np.number]] = None,
                      seed: Optional[int] = None) -> Tensor:
-    if seed:
-      self.tf.random.set_seed(seed)
+    """Return a tensor of uniformly distributed random numbers.
 
+    Args:
+      shape: The shape of the returned tensor.
+      boundaries: The lower and upper bound of the random numbers.
+      dtype: The dtype of the returned tensor. Defaults to `tf.float64`.
+      seed: The seed for the random numbers, see `randn`.
+    """
     dtype = dtype if dtype is not None else self.tf.float64
-    if (dtype is self.tf.complex128) or (dtype is self.tf.complex64):
-      return self.tf.complex(
-          self.tf.random.uniform(
-              shape=shape,
-              minval=boundaries[0],
-              maxval=boundaries[1],
-              dtype=dtype.real_dtype),
-          self.tf.random.uniform(
-              shape=shape,
-              minval=boundaries[0],
-              maxval=boundaries[1],
-              dtype=dtype.real_dtype))
-    self.tf.random.set_seed(10)
-    a = self.tf.random.uniform(
-        shape=shape, minval=boundaries[0], maxval=boundaries[1], dtype=dtype)
-    return a
+    return self._random(
+        "uniform",
+        shape,
+        dtype,
+        seed,
+        minval=boundaries[0],
+        maxval=boundaries[1])
 
   def conj(self, tensor: Tensor) -> Tensor:
-    return self.tf.math.conj(tensor)
+    return self._conj(tensor)
 
   def eigh(self, matrix: Tensor) -> Tuple[Tensor, Tensor]:
-    return self.tf.linalg.eigh(matrix)
+    # Accepts a `[..., N, N]` batch of matrices, which are decomposed by a
+    # single call. XLA's `eigh` is not accurate for complex matrices.
+    return self._call(_eigh, matrix, jit_compile=False)
 
   def eigs(self,
            A: Callable,
@@ -201,64 +1008,210 @@ class TensorFlowBackend(base_backend.BaseBackend):
       tol: Optional[float] = 1E-8,
       delta: Optional[float] = 1E-8,
       ndiag: Optional[int] = 20,
-      reorthogonalize: Optional[bool] = False) -> Tuple[List, List]:
-    raise NotImplementedError(
-        "Backend '{}' has not implemented eighs_lanczos.".format(self.name))
+      reorthogonalize: Optional[bool] = False,
+      args: Optional[List[Tensor]] = None) -> Tuple[List, List]:
+    """
+    Lanczos method for finding the lowest eigenvector-eigenvalue pairs
+    of a linear operator `A`. If no `initial_state` is provided
+    then `A` has to have an attribute `shape` so that a suitable initial
+    state can be randomly generated.
 
+    The whole iteration runs as a single `tf.while_loop`. If `args` is
+    given and `use_xla` is set, the loop is compiled with XLA, once per
+    `A` and per shapes and dtypes of `initial_state` and `args`. `A` is
+    then kept by the function cache, so it should be a fixed function
+    taking the varying tensors (e.g. the blocks of an effective
+    Hamiltonian) as `args`, rather than a new closure for every call.
+    Without `args` the loop runs uncompiled, since a new closure `A` would
+    have to be compiled anew on every call.
+
+    Args:
+      A: A (sparse) implementation of a linear operator
+      initial_state: An initial vector for the Lanczos algorithm. If `None`,
+        a random initial `Tensor` is created using the `backend.randn` method
+      num_krylov_vecs: The number of iterations (number of krylov vectors).
+      numeig: The nummber of eigenvector-eigenvalue pairs to be computed.
+        If `numeig > 1`, `reorthogonalize` has to be `True`.
+      tol: The desired precision of the eigenvalus. Uses
+        `tf.linalg.norm(eigvalsnew[0:numeig] - eigvalsold[0:numeig]) < tol`
+        as stopping criterion between two diagonalization steps of the
+        tridiagonal operator.
+      delta: Stopping criterion for Lanczos iteration.
+        If a Krylov vector :math: `x_n` has an L2 norm
+        :math:`\\lVert x_n\\rVert < delta`, the iteration
+        is stopped. It means that an (approximate) invariant subspace has
+        been found.
+      ndiag: The tridiagonal Operator is diagonalized every `ndiag` iterations
+        to check convergence.
+      reorthogonalize: If `True`, Krylov vectors are kept orthogonal by
+        explicit orthogonalization (more costly than `reorthogonalize=False`)
+      args: Optional tensors, passed to `A` as `A(x, *args)`. TensorFlow
+        backend only.
+    Returns:
+      (eigvals, eigvecs)
+       eigvals: A `Tensor` of `numeig` lowest eigenvalues
+       eigvecs: A list of `numeig` lowest eigenvectors
+    """
+    if num_krylov_vecs < numeig:
+      raise ValueError('`num_krylov_vecs` >= `numeig` required!')
+    if numeig > 1 and not reorthogonalize:
+      raise ValueError(
+          "Got numeig = {} > 1 and `reorthogonalize = False`. "
+          "Use `reorthogonalize=True` for `numeig > 1`".format(numeig))
+
+    if (initial_state is not None) and hasattr(A, 'shape'):
+      if initial_state.shape != A.shape[1]:
+        raise ValueError(
+            "A.shape[1]={} and initial_state.shape={} are incompatible.".format(
+                A.shape[1], initial_state.shape))
+
+    if initial_state is None:
+      if not hasattr(A, 'shape'):
+        raise AttributeError("`A` has no  attribute `shape`. Cannot initialize "
+                             "lanczos. Please provide a valid `initial_state`")
+      if not hasattr(A, 'dtype'):
+        raise AttributeError(
+            "`A` has no  attribute `dtype`. Cannot initialize "
+            "lanczos. Please provide a valid `initial_state` with "
+            "a `dtype` attribute")
+
+      initial_state = self.randn(A.shape[1], A.dtype)
+    if not isinstance(initial_state, (self.tf.Tensor, self.tf.Variable)):
+      raise TypeError("Expected a `tf.Tensor`. Got {}".format(
+          type(initial_state)))
+
+    static = dict(
+        A=A,
+        num_krylov_vecs=num_krylov_vecs,
+        numeig=numeig,
+        tol=tol,
+        delta=delta,
+        ndiag=ndiag,
+        reorthogonalize=reorthogonalize)
+    if args is None:
+      eigvals, eigvecs, num_vecs = _eigsh_lanczos(
+          self.tf, initial_state, compiled=False, **static)
+    else:
+      # Compiled right away: `compiled` has to be fixed here, and the
+      # uncompiled loop with bisection would be very slow.
+      static["compiled"] = self.use_xla
+      eigvals, eigvecs, num_vecs = self._call(
+          _eigsh_lanczos, initial_state, *args, eager_calls=0, **static)
+    if self.tf.executing_eagerly():
+      # An invariant subspace may have been found before `numeig` Krylov
+      # vectors were computed.
+      numeig = min(numeig, int(num_vecs))
+    return eigvals[:numeig], [eigvecs[n] for n in range(numeig)]
+
+  def _operands(self, tensor1: Tensor,
+                tensor2: Tensor) -> Tuple[Tensor, Tensor]:
+    """Converts a non-tensor operand to the dtype of the tensor operand.
+
+    This matches the python operators, e.g. `float32_tensor + np.float64(2)`
+    adds in `float32`, whereas the raw ops require identical dtypes.
+    """
+    tensor_types = (self.tf.Tensor, self.tf.Variable)
+    if isinstance(tensor1, tensor_types):
+      if not isinstance(tensor2, tensor_types):
+        tensor2 = self._convert(tensor2, dtype=tensor1.dtype)
+    elif isinstance(tensor2, tensor_types):
+      tensor1 = self._convert(tensor1, dtype=tensor2.dtype)
+    return tensor1, tensor2
+
+  # Single elementwise ops run eagerly: there is nothing for XLA to fuse,
+  # and compiling them would cost a compilation per new shape.
   def addition(self, tensor1: Tensor, tensor2: Tensor) -> Tensor:
-    return tensor1 + tensor2
+    return _addition(self.tf, *self._operands(tensor1, tensor2))
 
   def subtraction(self, tensor1: Tensor, tensor2: Tensor) -> Tensor:
-    return tensor1 - tensor2
+    return _subtraction(self.tf, *self._operands(tensor1, tensor2))
 
   def multiply(self, tensor1: Tensor, tensor2: Tensor) -> Tensor:
-    return tensor1 * tensor2
+    return _multiply(self.tf, *self._operands(tensor1, tensor2))
 
   def divide(self, tensor1: Tensor, tensor2: Tensor) -> Tensor:
-    return tensor1 / tensor2
+    return _divide(self.tf, *self._operands(tensor1, tensor2))
 
   def index_update(self, tensor: Tensor, mask: Tensor,
                    assignee: Tensor) -> Tensor:
     #returns a copy (unfortunately)
-    return self.tf.where(mask, assignee, tensor)
+    return self._where(mask, assignee, tensor)
+
+  def scatter_update(self, tensor: Tensor, indices: Tensor,
+                     assignee: Tensor) -> Tensor:
+    """Update `tensor` at the elements or slices `indices` with `assignee`.
+
+    Unlike `index_update` with a boolean mask, which requires a pass over
+    all of `tensor`, this only touches the updated entries.
+
+    Args:
+      tensor: A `Tensor` object.
+      indices: An integer `Tensor` of shape `(k, m)` holding the indices of
+        `k` elements (for `m == len(tensor.shape)`) or slices (for
+        `m < len(tensor.shape)`) of `tensor`, as in `tf.gather_nd`.
+      assignee: A scalar `Tensor`. The value assigned to `tensor` at
+        `indices`.
+    Returns:
+      The updated copy of `tensor`.
+    """
+    indices = self._convert(indices)
+    indices_shape = self._shape(indices)
+    updates_shape = self._concat(
+        [indices_shape[:-1], self._shape(tensor)[indices_shape[-1]:]], axis=0)
+    updates = self.tf.broadcast_to(
+        self.tf.cast(assignee, tensor.dtype), updates_shape)
+    return self.tf.tensor_scatter_nd_update(tensor, indices, updates)
 
   def inv(self, matrix: Tensor) -> Tensor:
-    if len(matrix.shape) > 2:
+    # `tf.linalg.inv` inverts all matrices of a `[..., N, N]` batch at once.
+    if len(matrix.shape) < 2:
       raise ValueError("input to tensorflow backend method `inv` has shape {}. "
-                       "Only matrices are supported.".format(
-                           self.tf.shape(matrix)))
-    return self.tf.linalg.inv(matrix)
+                       "Only (batches of) matrices are supported.".format(
+                           self._shape(matrix)))
+    return self._inv(matrix)
+
+  def inv_batched(self, matrices: Union[Tensor, Sequence[Tensor]]) -> Tensor:
+    """Batched version of `inv`.
+
+    Args:
+      matrices: Either a sequence of equally shaped square matrices or a
+        single tensor holding them stacked along its first axis.
+    Returns:
+      The inverses, stacked along the first axis.
+    """
+    return self.inv(self._stack(matrices))
 
   def broadcast_right_multiplication(self, tensor1: Tensor, tensor2: Tensor):
     if len(tensor2.shape) != 1:
       raise ValueError("only order-1 tensors are allowed for `tensor2`, "
                        "found `tensor2.shape = {}`".format(
-                           self.tf.shape(tensor2)))
+                           self._shape(tensor2)))
 
-    return tensor1 * tensor2
+    return _broadcast_right_multiplication(self.tf, tensor1, tensor2)
 
   def broadcast_left_multiplication(self, tensor1: Tensor, tensor2: Tensor):
     if len(tensor1.shape) != 1:
       raise ValueError("only order-1 tensors are allowed for `tensor1`,"
                        " found `tensor1.shape = {}`".format(
-                           self.tf.shape(tensor1)))
+                           self._shape(tensor1)))
 
-    t1_broadcast_shape = self.shape_concat(
-        [self.shape_tensor(tensor1), [1] * (len(tensor2.shape) - 1)],
-        axis=-1)
-    return tensor2 * self.reshape(tensor1, t1_broadcast_shape)
+    return _broadcast_left_multiplication(self.tf, tensor1, tensor2)
 
   def sin(self, tensor: Tensor):
-    return self.tf.math.sin(tensor)
+    return self._sin(tensor)
 
   def cos(self, tensor: Tensor):
-    return self.tf.math.cos(tensor)
+    return self._cos(tensor)
+
+  def sincos(self, tensor: Tensor) -> Tuple[Tensor, Tensor]:
+    # Under XLA both are computed by one fused kernel reading `tensor` once.
+    return self._call(_sincos, tensor)
 
   def exp(self, tensor: Tensor):
-    return self.tf.math.exp(tensor)
+    return self._exp(tensor)
 
   def log(self, tensor: Tensor):
-    return self.tf.math.log(tensor)
+    return self._log(tensor)
 
   def expm(self, matrix: Tensor):
     if len(matrix.shape) != 2:
@@ -268,4 +1221,13 @@ class TensorFlowBackend(base_backend.BaseBackend):
       raise ValueError("input to tensorflow backend method `expm` only supports"
                        "N*N matrix, {x}*{y} matrix is given"
                        .format(x=matrix.shape[0], y=matrix.shape[1]))
-    return self.tf.linalg.expm(matrix)
+    matrix = self._convert(matrix)
+    # XLA has no complex `MatrixSolve` kernel, which the Pade approximant
+    # in `tf.linalg.expm` relies on.
+    if self.compute_dtype is not None:
+      return self._call(
+          _mixed_precision_expm,
+          matrix,
+          accum_dtype=self.accum_dtype,
+          jit_compile=not matrix.dtype.is_complex)
+    return self._call(_expm, matrix, jit_compile=not matrix.dtype.is_complex)
@@ -1,14 +1,25 @@
 # pytype: skip-file
 """Tests for graphmode_tensornetwork."""
+import gc
+import inspect
+import sys
+import weakref
 import numpy as np
 import tensorflow as tf
 import pytest
+import tensornetwork
 from tensornetwork.backends.tensorflow import tensorflow_backend
 
 tf_randn_dtypes = [tf.float32, tf.float16, tf.float64]
 tf_dtypes = tf_randn_dtypes + [tf.complex128, tf.complex64]
 
 
+@pytest.fixture
+def compile_immediately(monkeypatch):
+  """Makes `_call` compile every signature on its first call."""
+  monkeypatch.setattr(tensorflow_backend, "_EAGER_CALLS", 0)
+
+
 def test_tensordot():
   backend = tensorflow_backend.TensorFlowBackend()
   a = backend.convert_to_tensor(2 * np.ones((2, 3, 4)))
@@ -18,6 +29,249 @@ def test_tensordot():
   np.testing.assert_allclose(expected, actual)
 
 
+@pytest.mark.parametrize("axes", [((1, 2), (1, 2)), [[1, 2], [1, 2]],
+                                  np.array([[1, 2], [1, 2]]),
+                                  [np.int64(1), np.int64(1)]])
+def test_tensordot_axes_types(axes):
+  backend = tensorflow_backend.TensorFlowBackend()
+  a = np.random.rand(2, 3, 4)
+  b = np.random.rand(2, 3, 4)
+  actual = backend.tensordot(
+      backend.convert_to_tensor(a), backend.convert_to_tensor(b), axes)
+  expected = np.tensordot(a, b, axes)
+  np.testing.assert_allclose(expected, actual)
+
+
+@pytest.mark.parametrize("use_xla", [True, False])
+@pytest.mark.usefixtures("compile_immediately")
+def test_use_xla(use_xla):
+  backend = tensorflow_backend.TensorFlowBackend(use_xla=use_xla)
+  a = backend.convert_to_tensor(2 * np.ones((2, 3, 4)))
+  b = backend.convert_to_tensor(np.ones((2, 3, 4)))
+  actual = backend.multiply(backend.tensordot(a, b, ((1, 2), (1, 2))), 0.5)
+  expected = np.array([[12.0, 12.0], [12.0, 12.0]])
+  np.testing.assert_allclose(expected, actual)
+
+
+def test_tensordot_ragged_axes():
+  backend = tensorflow_backend.TensorFlowBackend()
+  a = backend.randn((2, 3, 4), seed=10)
+  with pytest.raises(ValueError, match="Different number of contraction"):
+    backend.tensordot(a, a, [[0, 1], [0]])
+
+
+@pytest.mark.usefixtures("compile_immediately")
+def test_function_cache():
+  tensorflow_backend.clear_function_cache()
+  for _ in range(2):
+    backend = tensorflow_backend.TensorFlowBackend()
+    a = backend.randn((2, 3, 4), seed=10)
+    backend.tensordot(a, a, ((1, 2), (1, 2)))
+    backend.expm(backend.tensordot(a, a, ((1, 2), (1, 2))))
+  # pylint: disable=protected-access
+  cache_info = tensorflow_backend._concrete_function.cache_info()
+  assert cache_info.misses == 2
+  assert cache_info.hits == 4
+  tensorflow_backend.clear_function_cache()
+  assert tensorflow_backend._concrete_function.cache_info().currsize == 0
+
+
+def test_compile_recurring_signatures():
+  tensorflow_backend.clear_function_cache()
+  backend = tensorflow_backend.TensorFlowBackend()
+  a = backend.randn((2, 3), seed=10)
+  # pylint: disable=protected-access
+  for _ in range(tensorflow_backend._EAGER_CALLS):
+    backend.tensordot(a, a, [[0], [0]])
+  assert tensorflow_backend._concrete_function.cache_info().misses == 0
+  for _ in range(2):
+    np.testing.assert_allclose(
+        backend.tensordot(a, a, [[0], [0]]), a.numpy().T @ a)
+  cache_info = tensorflow_backend._concrete_function.cache_info()
+  assert cache_info.misses == 1
+  assert cache_info.hits == 1
+  backend.tensordot(a, a, [[1], [1]])
+  assert tensorflow_backend._concrete_function.cache_info().misses == 1
+
+
+@pytest.mark.parametrize("dtype", [tf.float32, tf.float64])
+def test_compute_dtype_tensordot(dtype):
+  backend = tensorflow_backend.TensorFlowBackend(compute_dtype=tf.bfloat16)
+  a = np.random.rand(4, 8).astype(dtype.as_numpy_dtype)
+  b = np.random.rand(8, 4).astype(dtype.as_numpy_dtype)
+  actual = backend.tensordot(
+      backend.convert_to_tensor(a), backend.convert_to_tensor(b), 1)
+  assert actual.dtype == dtype
+  np.testing.assert_allclose(actual, a @ b, rtol=5e-2)
+  outer = backend.outer_product(
+      backend.convert_to_tensor(a), backend.convert_to_tensor(b))
+  assert outer.dtype == dtype
+  np.testing.assert_allclose(outer, np.tensordot(a, b, 0), rtol=5e-2)
+
+
+def test_compute_dtype_complex_unchanged():
+  backend = tensorflow_backend.TensorFlowBackend(compute_dtype=tf.bfloat16)
+  a = backend.randn((4, 4), dtype=tf.complex128, seed=10)
+  actual = backend.tensordot(a, a, 1)
+  assert actual.dtype == tf.complex128
+  np.testing.assert_allclose(actual, a.numpy() @ a.numpy())
+
+
+def test_compute_dtype_expm():
+  backend = tensorflow_backend.TensorFlowBackend(compute_dtype=tf.bfloat16)
+  matrix = 0.1 * np.random.rand(4, 4)
+  actual = backend.expm(backend.convert_to_tensor(matrix))
+  assert actual.dtype == tf.float64
+  expected = tensorflow_backend.TensorFlowBackend().expm(
+      backend.convert_to_tensor(matrix))
+  np.testing.assert_allclose(actual, expected, rtol=1e-5)
+
+
+def test_compute_dtype_svd():
+  backend = tensorflow_backend.TensorFlowBackend(compute_dtype=tf.bfloat16)
+  tensor = np.random.rand(4, 6)
+  u, s, vh, _ = backend.svd_decomposition(
+      backend.convert_to_tensor(tensor), 1)
+  assert u.dtype == s.dtype == vh.dtype == tf.float64
+  np.testing.assert_allclose(s, np.linalg.svd(tensor, compute_uv=False),
+                             rtol=1e-5)
+  actual = backend.tensordot(
+      backend.broadcast_right_multiplication(u, s), vh, 1)
+  assert actual.dtype == tf.float64
+  np.testing.assert_allclose(actual, tensor, rtol=5e-2, atol=5e-2)
+
+
+def test_compute_dtype_split_node():
+  backend = tensorflow_backend.TensorFlowBackend(compute_dtype=tf.bfloat16)
+  tensor = np.random.rand(4, 6)
+  node = tensornetwork.Node(tensor, backend=backend)
+  left, right, _ = tensornetwork.split_node(node, [node[0]], [node[1]])
+  np.testing.assert_allclose((left @ right).tensor,
+                             tensor,
+                             rtol=5e-2,
+                             atol=5e-2)
+  node = tensornetwork.Node(tensor, backend=backend)
+  u, s, vh, _ = tensornetwork.split_node_full_svd(node, [node[0]], [node[1]])
+  np.testing.assert_allclose((u @ s @ vh).tensor,
+                             tensor,
+                             rtol=5e-2,
+                             atol=5e-2)
+
+
+def test_synchronous():
+  try:
+    backend = tensorflow_backend.TensorFlowBackend(synchronous=False)
+    assert not tf.config.experimental.get_synchronous_execution()
+    a = backend.randn((2, 2), seed=10)
+    np.testing.assert_allclose(backend.tensordot(a, a, 1), a.numpy() @ a)
+  finally:
+    tf.config.experimental.set_synchronous_execution(True)
+  tensorflow_backend.TensorFlowBackend()
+  assert tf.config.experimental.get_synchronous_execution()
+
+
+def test_no_host_reads():
+  source = inspect.getsource(tensorflow_backend)
+  assert ".numpy()" not in source
+  assert ".item()" not in source
+
+
+@pytest.mark.parametrize("use_xla", [True, False])
+@pytest.mark.usefixtures("compile_immediately")
+def test_aot_compile(use_xla):
+  backend = tensorflow_backend.TensorFlowBackend(use_xla=use_xla)
+  spec = tf.TensorSpec((2, 3, 4), tf.float64)
+  compiled = backend.aot_compile("tensordot", spec, spec, [[1, 2], [1, 2]])
+  assert backend.aot_compile("tensordot", spec, spec,
+                             [[1, 2], [1, 2]]) is compiled
+  a = backend.randn((2, 3, 4), seed=10)
+  b = backend.randn((2, 3, 4), seed=11)
+  np.testing.assert_allclose(
+      compiled(a, b), backend.tensordot(a, b, [[1, 2], [1, 2]]))
+
+
+def test_aot_compile_decomposition():
+  backend = tensorflow_backend.TensorFlowBackend()
+  compiled = backend.aot_compile("svd_decomposition",
+                                 tf.TensorSpec((4, 6), tf.float64), 1)
+  tensor = backend.randn((4, 6), seed=10)
+  for actual, expected in zip(
+      compiled(tensor), backend.svd_decomposition(tensor, 1)):
+    np.testing.assert_allclose(actual, expected)
+
+
+def test_aot_compile_raises():
+  backend = tensorflow_backend.TensorFlowBackend()
+  with pytest.raises(ValueError):
+    backend.aot_compile("inv", tf.TensorSpec((None, 3), tf.float64))
+  with pytest.raises(AttributeError):
+    backend.aot_compile("not_a_method", tf.TensorSpec((3, 3), tf.float64))
+
+
+@pytest.mark.parametrize("axes", [((0, 2), (2, 1)), [[2, 0], [1, 2]], 0,
+                                  [-3, -1], ((1,), (0,))])
+@pytest.mark.parametrize("use_xla", [True, False])
+@pytest.mark.usefixtures("compile_immediately")
+def test_tensordot_cached_tensor(axes, use_xla):
+  backend = tensorflow_backend.TensorFlowBackend(use_xla=use_xla)
+  a = np.random.rand(3, 4, 5)
+  b = np.random.rand(4, 5, 3)
+  expected = np.tensordot(a, b, axes)
+  cached_a = tensorflow_backend.CachedTensor(backend.convert_to_tensor(a))
+  cached_b = tensorflow_backend.CachedTensor(backend.convert_to_tensor(b))
+  for left, right in [(cached_a, cached_b), (cached_a, b), (a, cached_b)]:
+    for _ in range(2):
+      np.testing.assert_allclose(
+          backend.tensordot(left, right, axes), expected)
+  assert len(cached_a.transposed) <= 1
+  assert len(cached_b.transposed) <= 1
+
+
+def test_tensordot_cached_tensor_reuses_transpose():
+  backend = tensorflow_backend.TensorFlowBackend()
+  a = tensorflow_backend.CachedTensor(backend.randn((3, 4, 5), seed=10))
+  b = backend.randn((3, 5), seed=11)
+  backend.tensordot(a, b, ((0, 2), (0, 1)))
+  transposed = a.transposed[(1, 0, 2)]
+  backend.tensordot(a, b, ((0, 2), (0, 1)))
+  assert a.transposed[(1, 0, 2)] is transposed
+  np.testing.assert_allclose(
+      backend.outer_product(a, b), np.tensordot(a.tensor, b, 0))
+
+
+def test_call_static_numpy_arguments():
+  backend = tensorflow_backend.TensorFlowBackend()
+  tensor = backend.randn((4, 6), seed=10)
+  u, s, vh, s_rest = backend.svd_decomposition(
+      tensor, 1, max_singular_values=np.int64(2), relative=np.True_)
+  assert u.shape == (4, 2)
+  assert s.shape == (2,)
+  assert vh.shape == (2, 6)
+  assert s_rest.shape == (2,)
+
+
+def test_call_list_operands():
+  backend = tensorflow_backend.TensorFlowBackend()
+  a = [[1., 2.], [3., 4.]]
+  np.testing.assert_allclose(
+      backend.tensordot(a, a, 1), np.tensordot(a, a, 1))
+  x = backend.convert_to_tensor(np.ones(3))
+  np.testing.assert_allclose(backend.addition(x, [1., 2., 3.]), [2., 3., 4.])
+
+
+@pytest.mark.usefixtures("compile_immediately")
+def test_call_scalar_operands_share_function():
+  tensorflow_backend.clear_function_cache()
+  backend = tensorflow_backend.TensorFlowBackend()
+  a = backend.randn((3, 3), seed=10)
+  for i in range(5):
+    np.testing.assert_allclose(
+        backend.tensordot(a, a * float(i), 1), float(i) * (a.numpy() @ a))
+    backend.expm(backend.tensordot(a, a, 1) * float(i))
+  # pylint: disable=protected-access
+  assert tensorflow_backend._concrete_function.cache_info().misses == 2
+
+
 def test_reshape():
   backend = tensorflow_backend.TensorFlowBackend()
   a = backend.convert_to_tensor(np.ones((2, 3, 4)))
@@ -34,6 +288,18 @@ def test_transpose():
   np.testing.assert_allclose(expected, actual)
 
 
+@pytest.mark.parametrize("method", ["svd_decomposition", "qr_decomposition",
+                                    "rq_decomposition"])
+def test_decompositions_batched(method):
+  backend = tensorflow_backend.TensorFlowBackend()
+  tensors = [backend.randn((2, 3, 4), seed=n) for n in range(3)]
+  batched = getattr(backend, method + "_batched")(tensors, 2)
+  for n, tensor in enumerate(tensors):
+    expected = getattr(backend, method)(tensor, 2)
+    for actual, exp in zip(batched, expected):
+      assert actual[n].shape == exp.shape
+
+
 def test_shape_concat():
   backend = tensorflow_backend.TensorFlowBackend()
   a = backend.convert_to_tensor(2 * np.ones((1, 3, 1)))
@@ -71,6 +337,31 @@ def test_shape_tuple():
   assert actual == (2, 3, 4)
 
 
+def test_shape_tuple_cache():
+  # pylint: disable=protected-access
+  backend = tensorflow_backend.TensorFlowBackend()
+  a = backend.convert_to_tensor(np.ones([2, 3, 4]))
+  assert backend.shape_tuple(a) == (2, 3, 4)
+  assert id(a) in tensorflow_backend._SHAPE_CACHE
+  assert backend.shape_tuple(a) == (2, 3, 4)
+  key = id(a)
+  del a
+  assert key not in tensorflow_backend._SHAPE_CACHE
+
+
+def test_shape_tuple_graph_mode():
+  backend = tensorflow_backend.TensorFlowBackend()
+
+  @tf.function(input_signature=[tf.TensorSpec([None, 3], tf.float64)])
+  def f(x):
+    assert backend.shape_tuple(x) == (None, 3)
+    x.set_shape([2, 3])
+    assert backend.shape_tuple(x) == (2, 3)
+    return x
+
+  f(tf.ones((2, 3), dtype=tf.float64))
+
+
 def test_shape_prod():
   backend = tensorflow_backend.TensorFlowBackend()
   a = backend.convert_to_tensor(2 * np.ones([1, 2, 3, 4]))
@@ -103,6 +394,51 @@ def test_convert_to_tensor():
   np.testing.assert_allclose(expected, actual)
 
 
+def _aligned_array(shape, dtype, offset=0):
+  dtype = np.dtype(dtype)
+  size = int(np.prod(shape)) * dtype.itemsize
+  buffer = np.empty(size + 128, dtype=np.uint8)
+  start = (-buffer.ctypes.data) % 64 + offset * dtype.itemsize
+  array = buffer[start:start + size].view(dtype).reshape(shape)
+  array[...] = np.random.rand(*shape)
+  return array
+
+
+@pytest.mark.parametrize("dtype",
+                         [np.float32, np.float64, np.complex64, np.complex128])
+def test_convert_to_tensor_nocopy(dtype):
+  backend = tensorflow_backend.TensorFlowBackend()
+  array = _aligned_array((16, 16), dtype)
+  actual = backend.convert_to_tensor_nocopy(array)
+  assert isinstance(actual, tf.Tensor)
+  assert actual.dtype == dtype
+  np.testing.assert_allclose(actual, array)
+  np.testing.assert_allclose(
+      backend.tensordot(actual, actual, 1), array @ array, rtol=1e-5)
+  array[0, 0] = 42
+  assert actual[0, 0] == 42
+
+
+@pytest.mark.parametrize("array", [
+    _aligned_array((16, 16), np.float64, offset=1),
+    _aligned_array((16, 16), np.float64).T,
+    _aligned_array((16, 16), np.int64),
+    [[1.0, 2.0]],
+])
+def test_convert_to_tensor_nocopy_raises(array):
+  backend = tensorflow_backend.TensorFlowBackend()
+  with pytest.raises(ValueError):
+    backend.convert_to_tensor_nocopy(array)
+
+
+def test_convert_to_tensor_copies():
+  backend = tensorflow_backend.TensorFlowBackend()
+  array = _aligned_array((16, 16), np.float64)
+  actual = backend.convert_to_tensor(array)
+  array[0, 0] = 42
+  assert actual[0, 0] != 42
+
+
 def test_trace():
   backend = tensorflow_backend.TensorFlowBackend()
   a = backend.convert_to_tensor(np.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]))
@@ -129,12 +465,57 @@ def test_einsum():
   np.testing.assert_allclose(expected, actual)
 
 
+@pytest.mark.parametrize("use_xla", [True, False])
+@pytest.mark.usefixtures("compile_immediately")
+def test_einsum_multiple_operands(use_xla):
+  backend = tensorflow_backend.TensorFlowBackend(use_xla=use_xla)
+  a = np.random.rand(2, 3)
+  b = np.random.rand(3, 4, 5)
+  c = np.random.rand(5, 2)
+  actual = backend.einsum('ij,jkl,li->k', backend.convert_to_tensor(a),
+                          backend.convert_to_tensor(b),
+                          backend.convert_to_tensor(c))
+  expected = np.einsum('ij,jkl,li->k', a, b, c)
+  np.testing.assert_allclose(expected, actual)
+
+
+def test_einsum_multiple_operands_no_autograph_warning(caplog):
+  tensorflow_backend.clear_function_cache()
+  backend = tensorflow_backend.TensorFlowBackend()
+  tensors = [backend.ones(shape) for shape in [(2, 3), (3, 4), (4, 5)]]
+  with caplog.at_level("WARNING", logger="tensorflow"):
+    for _ in range(3):
+      backend.einsum('ij,jk,kl->il', *tensors)
+    backend.aot_compile('einsum', 'ij,jk,kl->il',
+                        *[tf.TensorSpec(t.shape, t.dtype) for t in tensors])
+  assert not caplog.records
+
+
 def test_norm():
   backend = tensorflow_backend.TensorFlowBackend()
   a = backend.convert_to_tensor(np.ones((2, 2)))
   assert backend.norm(a).numpy() == 2
 
 
+@pytest.mark.parametrize("dtype", tf_dtypes)
+def test_norm_dtypes(dtype):
+  backend = tensorflow_backend.TensorFlowBackend()
+  a = backend.randn((3, 4, 5), dtype=dtype, seed=10)
+  actual = backend.norm(a)
+  assert actual.dtype == dtype
+  np.testing.assert_allclose(actual, tf.linalg.norm(a), rtol=1e-3)
+
+
+@pytest.mark.usefixtures("compile_immediately")
+def test_norm_not_compiled():
+  tensorflow_backend.clear_function_cache()
+  backend = tensorflow_backend.TensorFlowBackend()
+  for n in range(1, 4):
+    np.testing.assert_allclose(backend.norm(backend.ones((n, n))), n)
+  # pylint: disable=protected-access
+  assert tensorflow_backend._concrete_function.cache_info().misses == 0
+
+
 @pytest.mark.parametrize("dtype", tf_dtypes)
 def test_eye(dtype):
   backend = tensorflow_backend.TensorFlowBackend()
@@ -156,6 +537,56 @@ def test_zeros(dtype):
   np.testing.assert_allclose(tf.zeros((4, 4), dtype=dtype), a)
 
 
+@pytest.mark.parametrize("method", ["ones", "zeros"])
+def test_cached_constants(method):
+  backend = tensorflow_backend.TensorFlowBackend()
+  assert getattr(backend, method)((4, 4)) is getattr(backend, method)([4, 4])
+  # pylint: disable=protected-access
+  large_shape = (tensorflow_backend._MAX_CACHED_CONSTANT_SIZE + 1,)
+  assert getattr(backend, method)(large_shape) is not getattr(
+      backend, method)(large_shape)
+
+
+def test_cached_eye():
+  backend = tensorflow_backend.TensorFlowBackend()
+  assert backend.eye(4, M=5) is backend.eye(4, M=5)
+  assert backend.eye(4, dtype=tf.float32) is not backend.eye(4)
+
+
+def test_cached_constants_device_scope():
+  backend = tensorflow_backend.TensorFlowBackend()
+  ones = backend.ones((2, 2))
+  with tf.device("/CPU:0"):
+    scoped = backend.ones((2, 2))
+    assert scoped is not ones
+    assert scoped is backend.ones((2, 2))
+    assert backend.eye(3) is backend.eye(3)
+  assert scoped.device.endswith("CPU:0")
+  assert backend.ones((2, 2)) is ones
+
+
+def test_constants_without_eager_context(monkeypatch):
+  # pylint: disable=import-outside-toplevel
+  from tensorflow.python import eager
+  monkeypatch.delattr(eager, "context")
+  monkeypatch.setitem(sys.modules, "tensorflow.python.eager.context", None)
+  backend = tensorflow_backend.TensorFlowBackend()
+  assert backend.ones((2, 2)) is not backend.ones((2, 2))
+  assert backend.eye(2) is not backend.eye(2)
+  np.testing.assert_allclose(backend.zeros((2, 2)), np.zeros((2, 2)))
+
+
+def test_constants_graph_mode():
+  backend = tensorflow_backend.TensorFlowBackend()
+
+  @tf.function
+  def f():
+    return backend.ones((2, 2)) + backend.eye(2)
+
+  np.testing.assert_allclose(f(), [[2., 1.], [1., 2.]])
+  np.testing.assert_allclose(f(), [[2., 1.], [1., 2.]])
+
+
 @pytest.mark.parametrize("dtype", tf_randn_dtypes)
 def test_randn(dtype):
   backend = tensorflow_backend.TensorFlowBackend()
@@ -248,6 +679,40 @@ def test_random_uniform_boundaries(dtype):
   test.assertAllInRange(b, lb, ub)
 
 
+@pytest.mark.parametrize("dtype", tf_dtypes)
+def test_randn_unseeded(dtype):
+  backend = tensorflow_backend.TensorFlowBackend()
+  a = backend.randn((4, 4), dtype=dtype)
+  b = backend.randn((4, 4), dtype=dtype)
+  assert a.dtype == dtype
+  assert np.any(a.numpy() != b.numpy())
+
+
+def test_random_uniform_does_not_reset_global_seed():
+  backend = tensorflow_backend.TensorFlowBackend()
+  tf.random.set_seed(1)
+  expected = tf.random.uniform((4,))
+  tf.random.set_seed(1)
+  backend.random_uniform((4, 4), seed=10)
+  np.testing.assert_allclose(tf.random.uniform((4,)), expected)
+
+
+@pytest.mark.parametrize("method", ["randn", "random_uniform"])
+def test_random_unseeded_global_generator(method):
+  backend = tensorflow_backend.TensorFlowBackend()
+  samples = []
+  for _ in range(2):
+    tf.random.set_global_generator(tf.random.Generator.from_seed(1))
+    samples.append(getattr(backend, method)((4, 4)))
+  np.testing.assert_allclose(samples[0], samples[1])
+  # `tf.random.set_seed` does not reset the global generator.
+  samples = []
+  for _ in range(2):
+    tf.random.set_seed(3)
+    samples.append(getattr(backend, method)((4, 4)))
+  assert np.any(samples[0].numpy() != samples[1].numpy())
+
+
 def test_conj():
   backend = tensorflow_backend.TensorFlowBackend()
   real = np.random.rand(2, 2, 2)
@@ -316,6 +781,38 @@ def test_divide(a, b, expected):
   assert tensor1.dtype == tensor2.dtype == result.dtype
 
 
+@pytest.mark.parametrize("use_xla", [True, False])
+@pytest.mark.parametrize("dtype", [tf.int32, tf.float32, tf.complex128])
+@pytest.mark.usefixtures("compile_immediately")
+def test_elementwise_arithmetic(dtype, use_xla):
+  backend = tensorflow_backend.TensorFlowBackend(use_xla=use_xla)
+  a = tf.cast(backend.convert_to_tensor(np.array([[1, 2, 3], [4, 5, 6]])),
+              dtype)
+  b = tf.cast(backend.convert_to_tensor(np.array([2, 4, 8])), dtype)
+  np.testing.assert_allclose(backend.addition(a, b), a + b)
+  np.testing.assert_allclose(backend.subtraction(a, b), a - b)
+  np.testing.assert_allclose(backend.multiply(a, b), a * b)
+  np.testing.assert_allclose(backend.divide(a, b), a / b)
+  np.testing.assert_allclose(backend.multiply(a, 2), a * 2)
+  c = tf.constant([True, True, False, False])
+  d = tf.constant([True, False, True, False])
+  np.testing.assert_array_equal(backend.multiply(c, d), c & d)
+
+
+@pytest.mark.parametrize("method,operator",
+                         [("addition", np.add), ("subtraction", np.subtract),
+                          ("multiply", np.multiply), ("divide", np.divide)])
+@pytest.mark.parametrize("other", [np.float64(2), 2.0, np.full(3, 2.0)])
+def test_elementwise_arithmetic_mixed_operands(method, operator, other):
+  backend = tensorflow_backend.TensorFlowBackend()
+  tensor = tf.constant([1., 2., 4.], dtype=tf.float32)
+  for operands in [(tensor, other), (other, tensor)]:
+    actual = getattr(backend, method)(*operands)
+    assert actual.dtype == tf.float32
+    np.testing.assert_allclose(
+        actual, operator(*[np.asarray(x, np.float32) for x in operands]))
+
+
 @pytest.mark.parametrize("dtype", [tf.float64, tf.complex128])
 def test_eigh(dtype):
   backend = tensorflow_backend.TensorFlowBackend()
@@ -328,6 +825,19 @@ def test_eigh(dtype):
   np.testing.assert_allclose(U, U_ac)
 
 
+@pytest.mark.parametrize("dtype", [tf.float64, tf.complex128])
+def test_eigh_batched(dtype):
+  backend = tensorflow_backend.TensorFlowBackend()
+  H = backend.randn((3, 4, 4), dtype, seed=10)
+  H = H + tf.math.conj(tf.linalg.matrix_transpose(H))
+  eta, U = backend.eigh(H)
+  for n in range(3):
+    eta_ac, _ = tf.linalg.eigh(H[n])
+    np.testing.assert_allclose(eta[n], eta_ac)
+    np.testing.assert_allclose(
+        tf.matmul(H[n], U[n]), U[n] * tf.cast(eta[n], dtype), atol=1e-10)
+
+
 @pytest.mark.parametrize("dtype", tf_randn_dtypes)
 def test_index_update(dtype):
   backend = tensorflow_backend.TensorFlowBackend()
@@ -338,6 +848,26 @@ def test_index_update(dtype):
   np.testing.assert_allclose(out, tensor_np)
 
 
+@pytest.mark.parametrize("dtype", tf_randn_dtypes)
+def test_scatter_update(dtype):
+  backend = tensorflow_backend.TensorFlowBackend()
+  tensor = backend.randn((4, 2, 3), dtype=dtype, seed=10)
+  out = backend.scatter_update(tensor, np.array([[0, 1, 2], [3, 0, 0]]), 0.0)
+  tensor_np = tensor.numpy()
+  tensor_np[0, 1, 2] = 0.0
+  tensor_np[3, 0, 0] = 0.0
+  np.testing.assert_allclose(out, tensor_np)
+
+
+def test_scatter_update_slices():
+  backend = tensorflow_backend.TensorFlowBackend()
+  tensor = backend.randn((4, 2, 3), seed=10)
+  out = backend.scatter_update(tensor, np.array([[1], [2]]), 1.0)
+  tensor_np = tensor.numpy()
+  tensor_np[1:3] = 1.0
+  np.testing.assert_allclose(out, tensor_np)
+
+
 @pytest.mark.parametrize("dtype", [tf.float64, tf.complex128])
 def test_matrix_inv(dtype):
   backend = tensorflow_backend.TensorFlowBackend()
@@ -353,21 +883,209 @@ def test_matrix_inv(dtype):
 @pytest.mark.parametrize("dtype", tf_dtypes)
 def test_matrix_inv_raises(dtype):
   backend = tensorflow_backend.TensorFlowBackend()
-  matrix = backend.randn((4, 4, 4), dtype=dtype, seed=10)
+  matrix = backend.randn((4,), dtype=dtype, seed=10)
   with pytest.raises(ValueError):
     backend.inv(matrix)
 
 
+@pytest.mark.parametrize("dtype", tf_dtypes)
+def test_matrix_inv_batched(dtype):
+  backend = tensorflow_backend.TensorFlowBackend()
+  matrices = backend.randn((3, 4, 4), dtype=dtype, seed=10)
+  expected = tf.linalg.inv(matrices)
+  np.testing.assert_allclose(backend.inv(matrices), expected)
+  np.testing.assert_allclose(backend.inv_batched(matrices), expected)
+  np.testing.assert_allclose(
+      backend.inv_batched([matrices[n] for n in range(3)]), expected)
+
+
 def test_eigs_not_implemented():
   backend = tensorflow_backend.TensorFlowBackend()
   with pytest.raises(NotImplementedError):
     backend.eigs(np.ones((2, 2)))
 
 
-def test_eigsh_lanczos_not_implemented():
+@pytest.mark.parametrize("use_xla", [True, False])
+@pytest.mark.parametrize("dtype", [tf.float64, tf.complex128])
+@pytest.mark.usefixtures("compile_immediately")
+def test_eigsh_lanczos_1(dtype, use_xla):
+  backend = tensorflow_backend.TensorFlowBackend(use_xla=use_xla)
+  D = 16
+  init = backend.randn((D,), dtype=dtype, seed=10)
+  tmp = backend.randn((D, D), dtype=dtype, seed=10)
+  H = tmp + backend.transpose(backend.conj(tmp), (1, 0))
+
+  def mv(x):
+    return tf.linalg.matvec(H, x)
+
+  eta1, U1 = backend.eigsh_lanczos(mv, init)
+  eta2, U2 = np.linalg.eigh(H)
+  v2 = U2[:, 0]
+  v2 = v2 / sum(v2)
+  v1 = np.reshape(U1[0], (D))
+  v1 = v1 / sum(v1)
+  np.testing.assert_allclose(eta1[0], min(eta2))
+  np.testing.assert_allclose(v1, v2)
+
+
+@pytest.mark.parametrize("dtype", [tf.float64, tf.complex128])
+def test_eigsh_lanczos_2(dtype):
   backend = tensorflow_backend.TensorFlowBackend()
-  with pytest.raises(NotImplementedError):
-    backend.eigsh_lanczos(np.ones((2, 2)))
+  D = 16
+  tmp = backend.randn((D, D), dtype=dtype, seed=10)
+  H = tmp + backend.transpose(backend.conj(tmp), (1, 0))
+
+  class LinearOperator:
+
+    def __init__(self, shape, dtype):
+      self.shape = shape
+      self.dtype = dtype
+
+    def __call__(self, x):
+      return tf.linalg.matvec(H, x)
+
+  mv = LinearOperator(shape=((D,), (D,)), dtype=dtype)
+  eta1, U1 = backend.eigsh_lanczos(mv)
+  eta2, U2 = np.linalg.eigh(H)
+  v2 = U2[:, 0]
+  v2 = v2 / sum(v2)
+  v1 = np.reshape(U1[0], (D))
+  v1 = v1 / sum(v1)
+  np.testing.assert_allclose(eta1[0], min(eta2))
+  np.testing.assert_allclose(v1, v2, rtol=10**(-5), atol=10**(-5))
+
+
+@pytest.mark.parametrize("dtype", [tf.float64, tf.complex128])
+@pytest.mark.parametrize("numeig", [1, 2, 3, 4])
+def test_eigsh_lanczos_reorthogonalize(dtype, numeig):
+  backend = tensorflow_backend.TensorFlowBackend()
+  D = 24
+  tmp = backend.randn((D, D), dtype=dtype, seed=10)
+  H = tmp + backend.transpose(backend.conj(tmp), (1, 0))
+
+  def mv(x):
+    return tf.linalg.matvec(H, x)
+
+  eta1, U1 = backend.eigsh_lanczos(
+      mv,
+      initial_state=backend.randn((D,), dtype=dtype, seed=10),
+      numeig=numeig,
+      reorthogonalize=True,
+      ndiag=1,
+      tol=10**(-12),
+      delta=10**(-12))
+  eta2, U2 = np.linalg.eigh(H)
+
+  np.testing.assert_allclose(eta1[0:numeig], eta2[0:numeig])
+  for n in range(numeig):
+    v2 = U2[:, n]
+    v2 = v2 / np.sum(v2)  #fix phases
+    v1 = np.reshape(U1[n], (D))
+    v1 = v1 / np.sum(v1)
+
+    np.testing.assert_allclose(v1, v2, rtol=10**(-5), atol=10**(-5))
+
+
+def test_eigsh_lanczos_closures_not_cached():
+  backend = tensorflow_backend.TensorFlowBackend()
+  D = 16
+  # pylint: disable=protected-access
+  cache_size = tensorflow_backend._concrete_function.cache_info().currsize
+  references = []
+  for seed in range(3):
+    tmp = backend.randn((D, D), seed=seed)
+    H = tmp + backend.transpose(tmp, (1, 0))
+    references.append(weakref.ref(H))
+
+    def mv(x, H=H):
+      return tf.linalg.matvec(H, x)
+
+    eta, _ = backend.eigsh_lanczos(mv, backend.randn((D,), seed=10))
+    np.testing.assert_allclose(eta[0], min(np.linalg.eigvalsh(H)))
+  del tmp, H, mv
+  gc.collect()
+  assert tensorflow_backend._concrete_function.cache_info().currsize == (
+      cache_size)
+  assert all(reference() is None for reference in references)
+
+
+def test_eigsh_lanczos_args():
+  tensorflow_backend.clear_function_cache()
+  backend = tensorflow_backend.TensorFlowBackend()
+  D = 16
+
+  def mv(x, H):
+    return tf.linalg.matvec(H, x)
+
+  for seed in range(2):
+    tmp = backend.randn((D, D), seed=seed)
+    H = tmp + backend.transpose(tmp, (1, 0))
+    eta, U = backend.eigsh_lanczos(
+        mv, backend.randn((D,), seed=10), args=[H])
+    np.testing.assert_allclose(eta[0], min(np.linalg.eigvalsh(H)))
+    np.testing.assert_allclose(
+        tf.linalg.matvec(H, U[0]), eta[0] * U[0], atol=1e-6)
+  # pylint: disable=protected-access
+  assert tensorflow_backend._concrete_function.cache_info().misses == 1
+
+
+@pytest.mark.parametrize("reorthogonalize", [False, True])
+def test_eigsh_lanczos_compiled_matches_uncompiled(reorthogonalize):
+  D = 16
+  tmp = np.random.RandomState(10).randn(D, D)
+  H = tf.constant(tmp + tmp.T)
+
+  def mv(x, H):
+    return tf.linalg.matvec(H, x)
+
+  results = []
+  for use_xla in [False, True]:
+    backend = tensorflow_backend.TensorFlowBackend(use_xla=use_xla)
+    # More Krylov vectors than `D`: the iteration stops at an invariant
+    # subspace.
+    results.append(
+        backend.eigsh_lanczos(
+            mv,
+            backend.randn((D,), seed=10),
+            num_krylov_vecs=100,
+            numeig=1 + reorthogonalize,
+            ndiag=5,
+            reorthogonalize=reorthogonalize,
+            args=[H]))
+  (eta1, U1), (eta2, U2) = results
+  np.testing.assert_allclose(eta1, np.linalg.eigvalsh(H)[:len(eta1)])
+  np.testing.assert_allclose(eta1, eta2)
+  for u1, u2 in zip(U1, U2):
+    np.testing.assert_allclose(np.abs(u1), np.abs(u2), atol=1e-6)
+
+
+def test_eigsh_lanczos_graph_mode():
+  backend = tensorflow_backend.TensorFlowBackend()
+  D = 16
+  tmp = backend.randn((D, D), seed=10)
+  H = tmp + backend.transpose(tmp, (1, 0))
+
+  @tf.function
+  def lowest_eigenvalue(initial_state):
+    eta, _ = backend.eigsh_lanczos(lambda x: tf.linalg.matvec(H, x),
+                                   initial_state)
+    return eta[0]
+
+  np.testing.assert_allclose(
+      lowest_eigenvalue(backend.randn((D,), seed=1)),
+      min(np.linalg.eigvalsh(H)))
+
+
+def test_eigsh_lanczos_raises():
+  backend = tensorflow_backend.TensorFlowBackend()
+  with pytest.raises(AttributeError):
+    backend.eigsh_lanczos(lambda x: x)
+  with pytest.raises(ValueError):
+    backend.eigsh_lanczos(lambda x: x, numeig=10, num_krylov_vecs=9)
+  with pytest.raises(ValueError):
+    backend.eigsh_lanczos(lambda x: x, numeig=2, reorthogonalize=False)
+  with pytest.raises(TypeError):
+    backend.eigsh_lanczos(lambda x: x, initial_state=[1.0] * 4)
 
 
 @pytest.mark.parametrize("dtype", [tf.float64, tf.complex128])
@@ -406,6 +1124,32 @@ def test_broadcast_left_multiplication_raises():
     backend.broadcast_left_multiplication(tensor1, tensor2)
 
 
+@pytest.mark.parametrize("dtype", tf_dtypes)
+def test_scale_rows(dtype):
+  backend = tensorflow_backend.TensorFlowBackend()
+  matrix = backend.randn((3, 4), dtype=dtype, seed=10)
+  diag_vec = backend.randn((3,), dtype=dtype, seed=10)
+  out = backend.scale_rows(matrix, diag_vec)
+  np.testing.assert_allclose(out, np.diag(diag_vec) @ matrix, rtol=1e-3)
+
+
+@pytest.mark.parametrize("dtype", tf_dtypes)
+def test_scale_cols(dtype):
+  backend = tensorflow_backend.TensorFlowBackend()
+  matrix = backend.randn((3, 4), dtype=dtype, seed=10)
+  diag_vec = backend.randn((4,), dtype=dtype, seed=10)
+  out = backend.scale_cols(matrix, diag_vec)
+  np.testing.assert_allclose(out, matrix @ np.diag(diag_vec), rtol=1e-3)
+
+
+def test_scale_svd_factors():
+  backend = tensorflow_backend.TensorFlowBackend()
+  tensor = backend.randn((4, 6), seed=10)
+  u, s, vh, _ = backend.svd_decomposition(tensor, 1)
+  out = backend.tensordot(backend.scale_cols(u, s), vh, 1)
+  np.testing.assert_allclose(out, tensor)
+
+
 def test_sparse_shape():
   dtype = tf.float64
   backend = tensorflow_backend.TensorFlowBackend()
@@ -429,6 +1173,17 @@ def test_elementwise_ops(dtype, method):
   np.testing.assert_almost_equal(tensor1.numpy(), tensor2.numpy())
 
 
+@pytest.mark.parametrize("dtype", [tf.float32, tf.float64, tf.complex128])
+@pytest.mark.parametrize("use_xla", [True, False])
+@pytest.mark.usefixtures("compile_immediately")
+def test_sincos(dtype, use_xla):
+  backend = tensorflow_backend.TensorFlowBackend(use_xla=use_xla)
+  tensor = backend.randn((4, 2, 1), dtype=dtype, seed=10)
+  sin, cos = backend.sincos(tensor)
+  np.testing.assert_allclose(sin, tf.math.sin(tensor), rtol=1e-6)
+  np.testing.assert_allclose(cos, tf.math.cos(tensor), rtol=1e-6)
+
+
 @pytest.mark.parametrize("dtype,method",
                          [(tf.float64, "expm"), (tf.complex128, "expm")])
 def test_matrix_ops(dtype, method):
@@ -439,6 +1194,17 @@ def test_matrix_ops(dtype, method):
   np.testing.assert_almost_equal(matrix1.numpy(), matrix2.numpy())
 
 
+@pytest.mark.parametrize("use_xla", [True, False])
+@pytest.mark.parametrize("dtype", [tf.float32, tf.float64, tf.complex128])
+@pytest.mark.usefixtures("compile_immediately")
+def test_expm_repeated_calls(dtype, use_xla):
+  backend = tensorflow_backend.TensorFlowBackend(use_xla=use_xla)
+  for N in [3, 4, 3]:
+    matrix = backend.randn((N, N), dtype=dtype, seed=10)
+    np.testing.assert_allclose(
+        backend.expm(matrix), tf.linalg.expm(matrix), rtol=1E-5)
+
+
 @pytest.mark.parametrize("dtype,method",
                          [(tf.float64, "expm"), (tf.complex128, "expm")])
 def test_matrix_ops_raises(dtype, method):